@@ -1,13 +1,19 @@
 import os
-import json
+import time
+import hashlib
+import orjson
 import aiohttp
 import asyncio
+import threading
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.errors import InvalidSqlStatementName
+from psycopg2.extras import DictCursor, RealDictCursor, execute_values
+from psycopg2.pool import ThreadedConnectionPool
 from datetime import datetime, timezone, timedelta
-from io import BytesIO, StringIO
+from io import BytesIO
 from PIL import Image
 from contextlib import contextmanager
+from functools import lru_cache
 import discord
 from discord.ext import commands, tasks
 from discord.ui import View, Button
@@ -19,6 +25,7 @@ FOOTBALL_DATA_API_KEY = os.environ.get("FOOTBALL_DATA_API_KEY")
 MATCH_CHANNEL_ID = int(os.environ.get("MATCH_CHANNEL_ID"))
 LEADERBOARD_CHANNEL_ID = int(os.environ.get("LEADERBOARD_CHANNEL_ID"))
 DATABASE_URL = os.environ.get("DATABASE_URL")
+DATABASE_READ_URL = os.environ.get("DATABASE_READ_URL")  # optional read replica
 
 if not all([DISCORD_BOT_TOKEN, FOOTBALL_DATA_API_KEY, MATCH_CHANNEL_ID, LEADERBOARD_CHANNEL_ID, DATABASE_URL]):
     raise ValueError("Missing one or more environment variables.")
@@ -28,19 +35,167 @@ intents = discord.Intents.default()
 intents.message_content = True
 bot = commands.Bot(command_prefix="!", intents=intents)
 
-# ==== CACHE FOR MATCH RESULTS ====
-match_results_cache = {}
-cache_timestamp = None
+# ==== CACHE FOR UPCOMING MATCHES ====
+FETCH_MATCHES_TTL = 60  # seconds
+fetch_matches_cache = {}  # hours -> (monotonic fetch time, matches)
+fetch_matches_lock = asyncio.Lock()
+
+# ==== SHARED HTTP SESSION ====
+http_session = None
+
+def get_http_session():
+    """Get the HTTP session shared by all API and crest requests, creating it on first use"""
+    global http_session
+    if http_session is None or http_session.closed:
+        # API and crest hosts are stable, so resolve them every few minutes rather than aiohttp's default 10s
+        http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=50, keepalive_timeout=60, ttl_dns_cache=300)
+        )
+    return http_session
+
+async def close_http_session():
+    """Close the shared HTTP session so its pooled connections shut down cleanly"""
+    global http_session
+    if http_session is not None and not http_session.closed:
+        await http_session.close()
+    http_session = None
 
 # ==== DATABASE CONTEXT MANAGER ====
+DB_POOL_MIN_CONN = 2
+DB_POOL_MAX_CONN = 20
+db_pool = None
+
+def get_db_pool():
+    """Get the process-wide connection pool, creating it on first use"""
+    global db_pool
+    if db_pool is None:
+        # Pin sessions to UTC so naive match_time columns compare correctly with aware datetimes
+        db_pool = ThreadedConnectionPool(DB_POOL_MIN_CONN, DB_POOL_MAX_CONN, DATABASE_URL,
+                                         cursor_factory=DictCursor, options="-c timezone=UTC")
+    return db_pool
+
+db_read_pool = None
+
+def get_db_read_pool():
+    """Get the pool for read-only command queries: the replica if configured, else the primary pool"""
+    global db_read_pool
+    if not DATABASE_READ_URL:
+        return get_db_pool()
+    if db_read_pool is None:
+        db_read_pool = ThreadedConnectionPool(DB_POOL_MIN_CONN, DB_POOL_MAX_CONN, DATABASE_READ_URL,
+                                              cursor_factory=DictCursor, options="-c timezone=UTC")
+    return db_read_pool
+
 @contextmanager
-def db_connection():
-    """Context manager for database connections"""
-    conn = psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor)
+def db_connection(read_only=False):
+    """Context manager for database connections borrowed from the pool"""
+    pool = get_db_read_pool() if read_only else get_db_pool()
+    conn = pool.getconn()
     try:
         yield conn
     finally:
-        conn.close()
+        if conn.closed:
+            pool.putconn(conn, close=True)
+        else:
+            try:
+                # Drop any transaction a read-only helper left open before reuse
+                conn.rollback()
+            except psycopg2.Error:
+                # The server dropped the connection; discard it so the pool slot is freed
+                pool.putconn(conn, close=True)
+            else:
+                pool.putconn(conn)
+
+# Helpers run off the event loop share the pool with the ones run on it, so cap them below its size
+DB_THREAD_CONCURRENCY = 10
+db_thread_semaphore = asyncio.Semaphore(DB_THREAD_CONCURRENCY)
+
+async def run_db(func, *args):
+    """Run a blocking database helper in a worker thread so slow queries don't stall the bot"""
+    async with db_thread_semaphore:
+        return await asyncio.to_thread(func, *args)
+
+async def drain_db_threads():
+    """Wait until no run_db worker thread is running by taking every semaphore slot"""
+    for _ in range(DB_THREAD_CONCURRENCY):
+        await db_thread_semaphore.acquire()
+
+# Per-vote statements run server-side prepared so Postgres parses and plans them once per connection
+PREPARED_STATEMENTS = {
+    "record_vote": ("text, text, text, text, timestamptz", """
+        WITH m AS (
+            SELECT match_id, home_team, away_team, match_time
+            FROM posted_matches WHERE match_id = $3
+        ), prev AS (
+            SELECT prediction FROM predictions
+            WHERE user_id = $1 AND match_id = $3
+        ), u AS (
+            INSERT INTO users (user_id, username, points)
+            SELECT $1, $2, 0 FROM m WHERE m.match_time > $5
+            ON CONFLICT (user_id) DO UPDATE SET username = EXCLUDED.username
+            WHERE users.username IS DISTINCT FROM EXCLUDED.username
+            RETURNING 1
+        ), p AS (
+            INSERT INTO predictions (user_id, match_id, prediction)
+            SELECT $1, m.match_id, $4 FROM m WHERE m.match_time > $5
+            ON CONFLICT (user_id, match_id) DO UPDATE SET prediction = EXCLUDED.prediction
+            WHERE predictions.prediction IS DISTINCT FROM EXCLUDED.prediction
+        )
+        SELECT m.home_team, m.away_team, m.match_time AT TIME ZONE 'UTC' AS match_time,
+               (SELECT prediction FROM prev) AS previous_prediction,
+               vd.live_predictions_msg_id,
+               EXISTS (SELECT 1 FROM u) AS user_changed
+        FROM m
+        LEFT JOIN vote_data vd ON vd.match_id = m.match_id
+    """),
+    "match_predictions": ("text", """
+        SELECT p.prediction, array_agg(DISTINCT u.username COLLATE "C" ORDER BY u.username COLLATE "C") AS usernames
+        FROM predictions p
+        JOIN users u ON p.user_id = u.user_id
+        WHERE p.match_id = $1
+        GROUP BY p.prediction
+    """),
+    "upcoming_predictions": ("text, timestamptz, integer, integer", """
+        SELECT p.prediction, pm.home_team, pm.away_team,
+               EXTRACT(EPOCH FROM pm.match_time AT TIME ZONE 'UTC')::bigint AS kickoff_ts,
+               pm.competition, COUNT(*) OVER () AS total_count
+        FROM predictions p
+        JOIN posted_matches pm ON p.match_id = pm.match_id
+        WHERE p.user_id = $1
+        AND pm.status != 'FINISHED'
+        AND pm.match_time > $2
+        ORDER BY pm.match_time ASC
+        LIMIT $3 OFFSET $4
+    """),
+    "finished_predictions": ("text, timestamptz, integer, integer", """
+        SELECT h.*, COUNT(*) OVER () AS total_count,
+               COUNT(*) FILTER (WHERE h.is_correct) OVER () AS total_correct
+        FROM (
+            SELECT p.prediction, pm.home_team, pm.away_team, pm.match_time,
+                   pm.home_score, pm.away_score,
+                   p.prediction = pm.actual_result AS is_correct
+            FROM predictions p
+            JOIN posted_matches pm ON p.match_id = pm.match_id
+            WHERE p.user_id = $1
+            AND pm.home_score IS NOT NULL
+            AND pm.match_time >= $2
+        ) h
+        ORDER BY h.match_time DESC
+        LIMIT $3 OFFSET $4
+    """),
+}
+
+def execute_prepared(cur, name, params):
+    """Execute a named statement, preparing it on this pooled connection the first time"""
+    execute_sql = f"EXECUTE {name} ({', '.join(['%s'] * len(params))})"
+    try:
+        cur.execute(execute_sql, params)
+    except InvalidSqlStatementName:
+        # Must be the connection's first statement: the rollback only clears the failed EXECUTE
+        cur.connection.rollback()
+        param_types, sql = PREPARED_STATEMENTS[name]
+        cur.execute(f"PREPARE {name} ({param_types}) AS {sql}")
+        cur.execute(execute_sql, params)
 
 # ==== DATABASE FUNCTIONS ====
 def init_db():
@@ -102,6 +257,16 @@ def init_db():
         cur.execute("ALTER TABLE posted_matches ADD COLUMN IF NOT EXISTS away_score INTEGER")
         cur.execute("ALTER TABLE posted_matches ADD COLUMN IF NOT EXISTS status TEXT DEFAULT 'SCHEDULED'")
         cur.execute("ALTER TABLE posted_matches ADD COLUMN IF NOT EXISTS notification_sent BOOLEAN DEFAULT FALSE")
+        # Winning side derived once when the score is written, so queries compare against a column
+        cur.execute("""
+            ALTER TABLE posted_matches ADD COLUMN IF NOT EXISTS actual_result TEXT GENERATED ALWAYS AS (
+                CASE
+                    WHEN home_score > away_score THEN 'home'
+                    WHEN away_score > home_score THEN 'away'
+                    WHEN home_score IS NOT NULL THEN 'draw'
+                END
+            ) STORED
+        """)
         
         # Create weekly_stats table
         cur.execute("""
@@ -114,16 +279,140 @@ def init_db():
             )
         """)
         
+        # Indexes for the hot lookups (live predictions, kickoff notifications, pending results, weekly recap)
+        # (match_id, prediction) also serves match_id-only lookups, so it replaces the old single-column index
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_predictions_match_pred ON predictions(match_id, prediction)")
+        cur.execute("DROP INDEX IF EXISTS idx_predictions_match_id")
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_posted_matches_notify ON posted_matches(match_time)
+            WHERE notification_sent = FALSE AND status = 'SCHEDULED'
+        """)
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_weekly_stats_week ON weekly_stats(week_start)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_users_points ON users(points DESC, username ASC)")
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_posted_matches_pending ON posted_matches(match_time)
+            WHERE status != 'FINISHED'
+        """)
+        
         conn.commit()
         print("Database initialized successfully")
 
-def get_leaderboard():
-    """Get all users sorted by points"""
+def get_leaderboard(limit=None, offset=0):
+    """Get a page of users sorted by points (all users when limit is None)"""
     with db_connection() as conn:
         cur = conn.cursor()
-        cur.execute("SELECT user_id, username, points FROM users ORDER BY points DESC, username ASC")
+        cur.execute("""
+            SELECT user_id, username, points, current_streak FROM users
+            ORDER BY points DESC, username ASC
+            LIMIT %s OFFSET %s
+        """, (limit, offset))
         return cur.fetchall()
 
+# Top of the leaderboard by page size; rankings only move when points change
+LEADERBOARD_CACHE_TTL = 300  # safety net; user and points writes invalidate explicitly
+leaderboard_cache = {}  # limit -> (monotonic timestamp, rows)
+# Same guard as the user summaries: filled and invalidated from run_db worker threads
+leaderboard_generation = 0
+leaderboard_lock = threading.Lock()
+
+def get_top_leaderboard(limit=10):
+    """Get the top leaderboard rows, served from memory until points change"""
+    cached = leaderboard_cache.get(limit)
+    if cached and time.monotonic() - cached[0] < LEADERBOARD_CACHE_TTL:
+        return cached[1]
+    generation = leaderboard_generation
+    rows = get_leaderboard(limit=limit)
+    with leaderboard_lock:
+        if leaderboard_generation == generation:
+            leaderboard_cache[limit] = (time.monotonic(), rows)
+    return rows
+
+rank_cache = None  # (monotonic timestamp, {user_id: position})
+
+def get_cached_rank(user_id):
+    """Get a user's leaderboard position and the player count, served from an in-memory rank map"""
+    global rank_cache
+    cached = rank_cache
+    if cached is None or time.monotonic() - cached[0] >= LEADERBOARD_CACHE_TTL:
+        generation = leaderboard_generation
+        cached = (time.monotonic(), get_leaderboard_ranks())
+        with leaderboard_lock:
+            if leaderboard_generation == generation:
+                rank_cache = cached
+    ranks = cached[1]
+    position = ranks.get(user_id)
+    if position is None:
+        # Joined since the map was built
+        return get_leaderboard_position(user_id)
+    return {"position": position, "total": len(ranks)}
+
+USER_SUMMARY_CACHE_TTL = 60
+user_summary_cache = {}  # user_id -> (monotonic timestamp, summary)
+# Bumped on every invalidation; reads that overlapped one don't store their result.
+# Summaries are read and invalidated from run_db worker threads, hence the lock.
+user_summary_generation = 0
+user_summary_lock = threading.Lock()
+
+def forget_user_summaries(user_id=None):
+    """Drop one user's cached summary, or all of them"""
+    global user_summary_generation
+    with user_summary_lock:
+        user_summary_generation += 1
+        if user_id is None:
+            user_summary_cache.clear()
+        else:
+            user_summary_cache.pop(user_id, None)
+
+def invalidate_leaderboard():
+    """Drop cached rankings and user summaries after any change to user points"""
+    global rank_cache, leaderboard_generation
+    with leaderboard_lock:
+        leaderboard_generation += 1
+        leaderboard_cache.clear()
+        rank_cache = None
+    forget_user_summaries()
+
+def get_leaderboard_stats(user_ids):
+    """Get player/points/prediction totals plus prediction counts for the listed users in one query"""
+    with db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT (SELECT COUNT(*) FROM users) as players,
+                   (SELECT COALESCE(SUM(points), 0) FROM users) as points,
+                   (SELECT COUNT(*) FROM predictions) as predictions,
+                   (SELECT json_object_agg(user_id, total) FROM (
+                        SELECT user_id, COUNT(*) as total FROM predictions
+                        WHERE user_id = ANY(%s) GROUP BY user_id
+                    ) c) as prediction_counts
+        """, (list(user_ids),))
+        stats = cur.fetchone()
+    return {
+        "players": stats['players'],
+        "points": stats['points'],
+        "predictions": stats['predictions'],
+        "prediction_counts": stats['prediction_counts'] or {},
+    }
+
+def get_leaderboard_ranks():
+    """Get every user's 1-based leaderboard position keyed by user_id"""
+    with db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT user_id, ROW_NUMBER() OVER (ORDER BY points DESC, username ASC) as position FROM users")
+        return {row['user_id']: row['position'] for row in cur.fetchall()}
+
+def get_leaderboard_position(user_id):
+    """Get a user's 1-based leaderboard position and the total player count"""
+    with db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT
+                (SELECT COUNT(*) FROM users o
+                 WHERE o.points > u.points OR (o.points = u.points AND o.username < u.username)) + 1 as position,
+                (SELECT COUNT(*) FROM users) as total
+            FROM users u WHERE u.user_id = %s
+        """, (user_id,))
+        return cur.fetchone()
+
 def get_user(user_id):
     """Get user data"""
     with db_connection() as conn:
@@ -139,8 +428,13 @@ def upsert_user(user_id, username):
             INSERT INTO users (user_id, username, points)
             VALUES (%s, %s, 0)
             ON CONFLICT (user_id) DO UPDATE SET username = EXCLUDED.username
+            WHERE users.username IS DISTINCT FROM EXCLUDED.username
         """, (user_id, username))
         conn.commit()
+        changed = cur.rowcount > 0
+    # Inserted or renamed
+    if changed:
+        invalidate_leaderboard()
 
 def add_prediction(user_id, match_id, prediction):
     """Add a prediction"""
@@ -165,71 +459,141 @@ def update_prediction(user_id, match_id, new_prediction):
         conn.commit()
         return cur.rowcount > 0
 
-def get_user_prediction(user_id, match_id):
-    """Get user's prediction for a match"""
+def record_vote(user_id, username, match_id, prediction, now):
+    """Save a vote in a single statement if the match hasn't started.
+    
+    Returns the match's teams, kickoff, live predictions message ID, the
+    user's previous prediction and whether their user row was inserted or
+    renamed, or None if the match isn't posted.
+    """
     with db_connection() as conn:
         cur = conn.cursor()
-        cur.execute("SELECT prediction FROM predictions WHERE user_id = %s AND match_id = %s", 
-                   (user_id, match_id))
+        execute_prepared(cur, "record_vote", (user_id, username, match_id, prediction, now))
         result = cur.fetchone()
-        return result['prediction'] if result else None
-
-def delete_prediction(user_id, match_id):
-    """Delete a prediction"""
-    with db_connection() as conn:
-        cur = conn.cursor()
-        cur.execute("DELETE FROM predictions WHERE user_id = %s AND match_id = %s", (user_id, match_id))
         conn.commit()
-        return cur.rowcount > 0
+    if result and result['user_changed']:
+        # New player or rename: the leaderboard and rank map are out of date
+        invalidate_leaderboard()
+    else:
+        # Prediction total may have changed
+        forget_user_summaries(user_id)
+    return result
 
-def update_user_streak(user_id, is_correct):
-    """Update user's streak"""
+def unpick_prediction(user_id, match_id, now):
+    """Delete a user's prediction if the match hasn't kicked off, in one round trip.
+    
+    Returns None if the match isn't posted, otherwise the match teams, whether
+    it has started, its live predictions message ID and the deleted prediction
+    (None when nothing was deleted).
+    """
     with db_connection() as conn:
         cur = conn.cursor()
-        
-        if is_correct:
-            cur.execute("""
-                UPDATE users 
-                SET current_streak = current_streak + 1,
-                    best_streak = GREATEST(best_streak, current_streak + 1)
-                WHERE user_id = %s
-            """, (user_id,))
-        else:
-            cur.execute("UPDATE users SET current_streak = 0 WHERE user_id = %s", (user_id,))
-        
+        cur.execute("""
+            WITH m AS (
+                SELECT pm.home_team, pm.away_team, pm.match_time <= %(now)s AS started,
+                       vd.live_predictions_msg_id
+                FROM posted_matches pm
+                LEFT JOIN vote_data vd ON vd.match_id = pm.match_id
+                WHERE pm.match_id = %(match_id)s
+            ), d AS (
+                DELETE FROM predictions
+                WHERE user_id = %(user_id)s AND match_id = %(match_id)s
+                AND EXISTS (SELECT 1 FROM m WHERE NOT m.started)
+                RETURNING prediction
+            )
+            SELECT m.*, (SELECT prediction FROM d) AS prediction FROM m
+        """, {"user_id": user_id, "match_id": match_id, "now": now})
+        result = cur.fetchone()
         conn.commit()
+    forget_user_summaries(user_id)
+    return result
 
-def get_user_streaks(user_id):
-    """Get user streak info"""
-    with db_connection() as conn:
-        cur = conn.cursor()
-        cur.execute("SELECT current_streak, best_streak FROM users WHERE user_id = %s", (user_id,))
-        result = cur.fetchone()
-        return result if result else {"current_streak": 0, "best_streak": 0}
+# Win streak lengths that get announced
+STREAK_MILESTONES = frozenset({3, 5, 10, 15, 20, 25, 30})
 
-def record_weekly_stat(user_id, is_correct):
-    """Record weekly statistics"""
+def apply_match_results(match_results):
+    """Score a batch of finished matches in one transaction.
+    
+    match_results maps match_id -> result dict from fetch_all_match_results.
+    Returns (any_correct, streak_alerts) where streak_alerts lists the
+    (username, streak) milestones reached.
+    """
+    today = datetime.now(timezone.utc).date()
+    week_start = today - timedelta(days=today.weekday())  # Monday
+    
     with db_connection() as conn:
         cur = conn.cursor()
-        today = datetime.now(timezone.utc).date()
-        week_start = today - timedelta(days=today.weekday())  # Monday
-        
-        if is_correct:
-            cur.execute("""
-                INSERT INTO weekly_stats (user_id, week_start, correct, total)
-                VALUES (%s, %s, 1, 1)
-                ON CONFLICT (user_id, week_start) 
-                DO UPDATE SET correct = weekly_stats.correct + 1, total = weekly_stats.total + 1
-            """, (user_id, week_start))
-        else:
+        cur.execute("""
+            SELECT p.user_id, p.match_id, p.prediction
+            FROM predictions p
+            LEFT JOIN posted_matches pm ON p.match_id = pm.match_id
+            WHERE p.match_id = ANY(%s)
+            ORDER BY pm.match_time NULLS LAST, p.match_id
+        """, (list(match_results),))
+        
+        # Each user's outcomes in kickoff order, so streaks advance in the right sequence
+        outcomes = {}
+        for row in cur.fetchall():
+            is_correct = row['prediction'] == match_results[row['match_id']]['result']
+            outcomes.setdefault(row['user_id'], []).append(is_correct)
+        
+        streak_alerts = []
+        if outcomes:
             cur.execute("""
-                INSERT INTO weekly_stats (user_id, week_start, correct, total)
-                VALUES (%s, %s, 0, 1)
-                ON CONFLICT (user_id, week_start) 
-                DO UPDATE SET total = weekly_stats.total + 1
-            """, (user_id, week_start))
-        
+                SELECT user_id, username, current_streak, best_streak FROM users
+                WHERE user_id = ANY(%s) FOR UPDATE
+            """, (list(outcomes),))
+            users = {row['user_id']: row for row in cur.fetchall()}
+            
+            user_updates = []
+            weekly_updates = []
+            for user_id, user_outcomes in outcomes.items():
+                correct = sum(user_outcomes)
+                weekly_updates.append((user_id, week_start, correct, len(user_outcomes)))
+                
+                user = users.get(user_id)
+                if not user:
+                    continue
+                current, best = user['current_streak'] or 0, user['best_streak'] or 0
+                for is_correct in user_outcomes:
+                    if is_correct:
+                        current += 1
+                        best = max(best, current)
+                        if current in STREAK_MILESTONES:
+                            streak_alerts.append((user['username'], current))
+                    else:
+                        current = 0
+                user_updates.append((user_id, correct, current, best))
+            
+            execute_values(cur, """
+                UPDATE users
+                SET points = users.points + v.points, current_streak = v.current_streak, best_streak = v.best_streak
+                FROM (VALUES %s) AS v(user_id, points, current_streak, best_streak)
+                WHERE users.user_id = v.user_id
+            """, user_updates)
+            execute_values(cur, """
+                INSERT INTO weekly_stats (user_id, week_start, correct, total) VALUES %s
+                ON CONFLICT (user_id, week_start)
+                DO UPDATE SET correct = weekly_stats.correct + EXCLUDED.correct,
+                              total = weekly_stats.total + EXCLUDED.total
+            """, weekly_updates)
+        
+        scores = [(match_id, r['home_score'], r['away_score']) for match_id, r in match_results.items()
+                  if r.get('home_score') is not None and r.get('away_score') is not None]
+        execute_values(cur, """
+            UPDATE posted_matches
+            SET home_score = v.home_score, away_score = v.away_score, status = 'FINISHED'
+            FROM (VALUES %s) AS v(match_id, home_score, away_score)
+            WHERE posted_matches.match_id = v.match_id
+        """, scores)
+        execute_values(cur, "INSERT INTO processed_matches (match_id) VALUES %s ON CONFLICT DO NOTHING",
+                       [(match_id,) for match_id in match_results])
         conn.commit()
+    processed_match_ids.update(match_results)
+    invalidate_leaderboard()
+    
+    any_correct = any(any(user_outcomes) for user_outcomes in outcomes.values())
+    return any_correct, streak_alerts
 
 def get_weekly_stats(user_id, week_start):
     """Get stats for a specific week"""
@@ -258,13 +622,39 @@ def get_last_week_stats():
         """, (last_week_start,))
         return cur.fetchall()
 
-def mark_notification_sent(match_id):
-    """Mark that notification was sent for this match"""
+def mark_notifications_sent(match_ids):
+    """Mark that notifications were sent for these matches"""
     with db_connection() as conn:
         cur = conn.cursor()
-        cur.execute("UPDATE posted_matches SET notification_sent = TRUE WHERE match_id = %s", (match_id,))
+        cur.execute("UPDATE posted_matches SET notification_sent = TRUE WHERE match_id = ANY(%s)", (list(match_ids),))
         conn.commit()
 
+def get_non_voters(match_ids, limit=10):
+    """Get how many users haven't predicted, per match, with up to `limit` of their IDs"""
+    with db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT match_id, user_id, total
+            FROM (
+                SELECT m.match_id, u.user_id,
+                       COUNT(*) OVER (PARTITION BY m.match_id) AS total,
+                       ROW_NUMBER() OVER (PARTITION BY m.match_id) AS rn
+                FROM unnest(%s::text[]) AS m(match_id)
+                CROSS JOIN users u
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM predictions p 
+                    WHERE p.user_id = u.user_id AND p.match_id = m.match_id
+                )
+            ) nv
+            WHERE rn <= %s
+        """, (list(match_ids), limit))
+        non_voters = {match_id: {"total": 0, "user_ids": []} for match_id in match_ids}
+        for row in cur.fetchall():
+            entry = non_voters[row['match_id']]
+            entry["total"] = row['total']
+            entry["user_ids"].append(row['user_id'])
+        return non_voters
+
 def get_upcoming_matches_for_notification():
     """Get matches starting in 10-15 minutes that haven't been notified"""
     with db_connection() as conn:
@@ -283,36 +673,151 @@ def get_upcoming_matches_for_notification():
         return cur.fetchall()
 
 def get_predictions_for_match(match_id):
-    """Get all predictions for a match grouped by prediction type"""
+    """Get sorted usernames for a match grouped by prediction type"""
     with db_connection() as conn:
         cur = conn.cursor()
-        cur.execute("""
-            SELECT p.prediction, u.username
-            FROM predictions p
-            JOIN users u ON p.user_id = u.user_id
-            WHERE p.match_id = %s
-            ORDER BY u.username
-        """, (match_id,))
+        execute_prepared(cur, "match_predictions", (match_id,))
         results = cur.fetchall()
     
-    votes = {"home": set(), "draw": set(), "away": set()}
+    votes = {"home": [], "draw": [], "away": []}
     for row in results:
-        votes[row['prediction']].add(row['username'])
+        votes[row['prediction']] = row['usernames']
     return votes
 
-def get_user_stats(user_id):
-    """Get user prediction stats"""
+# Rows per embed page in /upcoming and /history
+PREDICTIONS_PAGE_SIZE = 20
+
+def get_ongoing_predictions(user_id, now, limit=15):
+    """Get a user's predictions for started but unfinished matches, with the total as total_count"""
+    with db_connection(read_only=True) as conn:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT p.prediction, pm.home_team, pm.away_team, pm.match_time,
+                   pm.competition, pm.home_score, pm.away_score,
+                   COUNT(*) OVER () AS total_count
+            FROM predictions p
+            JOIN posted_matches pm ON p.match_id = pm.match_id
+            WHERE p.user_id = %s
+            AND pm.status != 'FINISHED'
+            AND pm.match_time <= %s
+            ORDER BY pm.match_time ASC
+            LIMIT %s
+        """, (user_id, now, limit))
+        return cur.fetchall()
+
+def get_upcoming_predictions(user_id, now, limit=PREDICTIONS_PAGE_SIZE, offset=0):
+    """Get a page of a user's predictions for matches yet to kick off, with the total as total_count"""
+    with db_connection(read_only=True) as conn:
+        cur = conn.cursor()
+        execute_prepared(cur, "upcoming_predictions", (user_id, now, limit, offset))
+        return cur.fetchall()
+
+def get_finished_predictions(user_id, since, limit=PREDICTIONS_PAGE_SIZE, offset=0):
+    """Get a page of a user's scored predictions since a given time, latest first.
+    
+    Each row carries is_correct, plus total_count and total_correct across all pages.
+    """
+    with db_connection(read_only=True) as conn:
+        cur = conn.cursor()
+        execute_prepared(cur, "finished_predictions", (user_id, since, limit, offset))
+        return cur.fetchall()
+
+def get_user_summaries(user_ids):
+    """Get points, streaks, prediction total, correct count and accuracy for several users.
+    
+    Recently fetched summaries are served from memory; the rest come from one query.
+    """
+    now = time.monotonic()
+    summaries = {}
+    missing = []
+    for user_id in user_ids:
+        cached = user_summary_cache.get(user_id)
+        if cached and now - cached[0] < USER_SUMMARY_CACHE_TTL:
+            summaries[user_id] = cached[1]
+        else:
+            missing.append(user_id)
+    if not missing:
+        return summaries
+    
+    generation = user_summary_generation
+    # Primary, not the replica: a lagging read would be cached for a full TTL after a vote
     with db_connection() as conn:
         cur = conn.cursor()
-        cur.execute("SELECT COUNT(*) as total FROM predictions WHERE user_id = %s", (user_id,))
-        total = cur.fetchone()['total']
-        
-        cur.execute("SELECT points FROM users WHERE user_id = %s", (user_id,))
-        user = cur.fetchone()
-        correct = user['points'] if user else 0
+        cur.execute("""
+            SELECT u.user_id, u.username, u.points, u.current_streak, u.best_streak,
+                   (SELECT COUNT(*) FROM predictions p WHERE p.user_id = u.user_id) as total
+            FROM users u WHERE u.user_id = ANY(%s)
+        """, (missing,))
+        rows = cur.fetchall()
+    
+    for row in rows:
+        summary = dict(row)
+        summary['current_streak'] = summary['current_streak'] or 0
+        summary['best_streak'] = summary['best_streak'] or 0
+        summary['correct'] = summary['points'] or 0
+        summary['accuracy'] = (summary['correct'] / summary['total'] * 100) if summary['total'] > 0 else 0
+        summaries[row['user_id']] = summary
+    
+    with user_summary_lock:
+        if user_summary_generation == generation:
+            for row in rows:
+                user_summary_cache[row['user_id']] = (now, summaries[row['user_id']])
+    return summaries
+
+def get_user_summary(user_id):
+    """Get one user's summary from get_user_summaries, or None if they don't exist"""
+    return get_user_summaries([user_id]).get(user_id)
+
+def peek_user_summary(user_id):
+    """Get a user's summary only if it's cached and fresh, without touching the database"""
+    cached = user_summary_cache.get(user_id)
+    if cached and time.monotonic() - cached[0] < USER_SUMMARY_CACHE_TTL:
+        return cached[1]
+    return None
+
+def get_competition_breakdown(user_id, limit=5):
+    """Get a user's prediction counts for their most-predicted competitions"""
+    with db_connection(read_only=True) as conn:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT pm.competition, COUNT(*) as total
+            FROM predictions p
+            JOIN posted_matches pm ON p.match_id = pm.match_id
+            WHERE p.user_id = %s AND pm.competition IS NOT NULL
+            GROUP BY pm.competition
+            ORDER BY total DESC
+            LIMIT %s
+        """, (user_id, limit))
+        return cur.fetchall()
+
+def get_head_to_head(user1_id, user2_id):
+    """Get the 3 latest of two users' last 5 shared finished matches.
     
-    accuracy = (correct / total * 100) if total > 0 else 0
-    return {"total": total, "correct": correct, "accuracy": accuracy}
+    Rows carry each user's correctness plus user1_wins/user2_wins counted over all 5.
+    """
+    with db_connection(read_only=True) as conn:
+        cur = conn.cursor()
+        cur.execute("""
+            WITH h2h AS (
+                SELECT pm.home_team, pm.away_team, pm.home_score, pm.away_score, pm.match_time,
+                       p1.prediction = pm.actual_result as user1_correct,
+                       p2.prediction = pm.actual_result as user2_correct
+                FROM predictions p1
+                JOIN predictions p2 ON p1.match_id = p2.match_id
+                JOIN posted_matches pm ON p1.match_id = pm.match_id
+                WHERE p1.user_id = %s AND p2.user_id = %s
+                AND pm.status = 'FINISHED' AND pm.home_score IS NOT NULL
+                ORDER BY pm.match_time DESC
+                LIMIT 5
+            )
+            SELECT h2h.*,
+                   COUNT(*) FILTER (WHERE user1_correct AND NOT user2_correct) OVER () as user1_wins,
+                   COUNT(*) FILTER (WHERE user2_correct AND NOT user1_correct) OVER () as user2_wins
+            FROM h2h
+            ORDER BY match_time DESC
+            LIMIT 3
+        """, (user1_id, user2_id))
+        return cur.fetchall()
 
 def user_has_prediction(user_id, match_id):
     """Check if user already voted"""
@@ -327,6 +832,7 @@ def add_points(user_id, points_to_add):
         cur = conn.cursor()
         cur.execute("UPDATE users SET points = points + %s WHERE user_id = %s", (points_to_add, user_id))
         conn.commit()
+    invalidate_leaderboard()
 
 def set_user_points(user_id, points):
     """Set user points to specific value"""
@@ -334,24 +840,27 @@ def set_user_points(user_id, points):
         cur = conn.cursor()
         cur.execute("UPDATE users SET points = %s WHERE user_id = %s", (points, user_id))
         conn.commit()
+    invalidate_leaderboard()
 
-def is_match_posted(match_id):
-    """Check if match already posted"""
-    with db_connection() as conn:
-        cur = conn.cursor()
-        cur.execute("SELECT 1 FROM posted_matches WHERE match_id = %s", (match_id,))
-        return cur.fetchone() is not None
+# Known posted/processed match IDs, loaded at startup and kept in step with the inserts below
+posted_match_ids = set()
+processed_match_ids = set()
 
-def mark_match_posted(match_id, home_team, away_team, match_time, competition):
-    """Mark match as posted"""
+KNOWN_MATCH_IDS_BATCH = 2000
+
+def load_known_match_ids():
+    """Load posted and processed match IDs into memory for existence checks"""
     with db_connection() as conn:
-        cur = conn.cursor()
-        cur.execute("""
-            INSERT INTO posted_matches (match_id, home_team, away_team, match_time, competition)
-            VALUES (%s, %s, %s, %s, %s)
-            ON CONFLICT DO NOTHING
-        """, (match_id, home_team, away_team, match_time, competition))
-        conn.commit()
+        # Server-side cursors stream the ID columns in batches; both tables only ever grow
+        for table, known_ids in (("posted_matches", posted_match_ids), ("processed_matches", processed_match_ids)):
+            with conn.cursor(name=f"load_{table}") as cur:
+                cur.itersize = KNOWN_MATCH_IDS_BATCH
+                cur.execute(f"SELECT match_id FROM {table}")
+                known_ids.update(row['match_id'] for row in cur)
+
+def is_match_posted(match_id):
+    """Check if match already posted"""
+    return match_id in posted_match_ids
 
 def update_match_score(match_id, home_score, away_score, status):
     """Update match score and status"""
@@ -364,45 +873,45 @@ def update_match_score(match_id, home_score, away_score, status):
         """, (home_score, away_score, status, match_id))
         conn.commit()
 
-def get_match_info(match_id):
-    """Get match information including scores"""
+def get_match_messages(match_ids):
+    """Get match info joined with its vote/live message IDs for a batch of matches"""
     with db_connection() as conn:
         cur = conn.cursor()
         cur.execute("""
-            SELECT home_team, away_team, home_score, away_score, status, competition, match_time
-            FROM posted_matches WHERE match_id = %s
-        """, (match_id,))
-        return cur.fetchone()
-
-def save_vote_message(match_id, msg_id):
-    """Save vote message ID"""
+            SELECT pm.match_id, pm.home_team, pm.away_team, pm.home_score, pm.away_score, pm.status,
+                   vd.votes_msg_id, vd.buttons_disabled, vd.live_predictions_msg_id
+            FROM posted_matches pm
+            LEFT JOIN vote_data vd ON vd.match_id = pm.match_id
+            WHERE pm.match_id = ANY(%s)
+        """, (list(match_ids),))
+        return {row['match_id']: row for row in cur.fetchall()}
+
+SAVE_MATCH_MESSAGES_SQL = """
+    INSERT INTO vote_data (match_id, votes_msg_id, live_predictions_msg_id)
+    VALUES (%s, %s, %s)
+    ON CONFLICT (match_id) DO UPDATE
+    SET votes_msg_id = EXCLUDED.votes_msg_id, live_predictions_msg_id = EXCLUDED.live_predictions_msg_id
+"""
+
+def save_match_messages(match_id, votes_msg_id, live_msg_id):
+    """Save vote and live predictions message IDs"""
     with db_connection() as conn:
         cur = conn.cursor()
-        cur.execute("""
-            INSERT INTO vote_data (match_id, votes_msg_id)
-            VALUES (%s, %s)
-            ON CONFLICT (match_id) DO UPDATE SET votes_msg_id = EXCLUDED.votes_msg_id
-        """, (match_id, msg_id))
+        cur.execute(SAVE_MATCH_MESSAGES_SQL, (match_id, votes_msg_id, live_msg_id))
         conn.commit()
 
-def save_live_predictions_message(match_id, msg_id):
-    """Save live predictions message ID"""
+def record_posted_match(match_id, home_team, away_team, match_time, competition, votes_msg_id, live_msg_id):
+    """Save a newly posted match and its message IDs in one transaction"""
     with db_connection() as conn:
         cur = conn.cursor()
+        cur.execute(SAVE_MATCH_MESSAGES_SQL, (match_id, votes_msg_id, live_msg_id))
         cur.execute("""
-            UPDATE vote_data
-            SET live_predictions_msg_id = %s
-            WHERE match_id = %s
-        """, (msg_id, match_id))
+            INSERT INTO posted_matches (match_id, home_team, away_team, match_time, competition)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT DO NOTHING
+        """, (match_id, home_team, away_team, match_time, competition))
         conn.commit()
-
-def get_live_predictions_message_id(match_id):
-    """Get live predictions message ID"""
-    with db_connection() as conn:
-        cur = conn.cursor()
-        cur.execute("SELECT live_predictions_msg_id FROM vote_data WHERE match_id = %s", (match_id,))
-        result = cur.fetchone()
-        return result['live_predictions_msg_id'] if result else None
+    posted_match_ids.add(match_id)
 
 def get_vote_message_id(match_id):
     """Get vote message ID"""
@@ -418,12 +927,34 @@ def disable_vote_buttons(match_id):
         cur.execute("UPDATE vote_data SET buttons_disabled = TRUE WHERE match_id = %s", (match_id,))
         conn.commit()
 
-def is_match_processed(match_id):
-    """Check if match results were already processed"""
+def get_unstarted_matches():
+    """Get posted matches that haven't kicked off yet"""
     with db_connection() as conn:
         cur = conn.cursor()
-        cur.execute("SELECT 1 FROM processed_matches WHERE match_id = %s", (match_id,))
-        return cur.fetchone() is not None
+        cur.execute("""
+            SELECT match_id, match_time AT TIME ZONE 'UTC' AS match_time FROM posted_matches
+            WHERE match_time > %s AND status != 'FINISHED'
+        """, (datetime.now(timezone.utc),))
+        return cur.fetchall()
+
+def get_started_enabled_matches(now):
+    """Get matches that kicked off in the last 15 minutes whose vote buttons are still enabled"""
+    with db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT vd.match_id, vd.votes_msg_id, pm.home_team, pm.away_team
+            FROM vote_data vd
+            JOIN posted_matches pm ON vd.match_id = pm.match_id
+            WHERE pm.match_time <= %s
+            AND pm.match_time > %s
+            AND vd.buttons_disabled = FALSE
+            AND pm.status != 'FINISHED'
+        """, (now, now - timedelta(minutes=15)))
+        return cur.fetchall()
+
+def is_match_processed(match_id):
+    """Check if match results were already processed"""
+    return match_id in processed_match_ids
 
 def mark_match_processed(match_id):
     """Mark match as processed"""
@@ -431,6 +962,31 @@ def mark_match_processed(match_id):
         cur = conn.cursor()
         cur.execute("INSERT INTO processed_matches (match_id) VALUES (%s) ON CONFLICT DO NOTHING", (match_id,))
         conn.commit()
+    processed_match_ids.add(match_id)
+
+def get_pending_results_snapshot():
+    """Get the earliest unprocessed kickoff and every user's points, or None if nothing is pending"""
+    with db_connection() as conn:
+        cur = conn.cursor()
+        
+        # Stops at the first hit in kickoff order
+        cur.execute("""
+            SELECT pm.match_time as earliest FROM posted_matches pm
+            WHERE pm.status != 'FINISHED'
+            AND pm.match_time < NOW()
+            AND NOT EXISTS (
+                SELECT 1 FROM processed_matches proc WHERE proc.match_id = pm.match_id
+            )
+            ORDER BY pm.match_time
+            LIMIT 1
+        """)
+        row = cur.fetchone()
+        if row is None:
+            return None
+        
+        cur.execute("SELECT user_id, points FROM users")
+        previous_points = {user['user_id']: user['points'] for user in cur.fetchall()}
+        return row['earliest'], previous_points
 
 # ==== COMPETITION INFO ====
 COMPETITION_INFO = {
@@ -448,20 +1004,30 @@ HEADERS = {"X-Auth-Token": FOOTBALL_DATA_API_KEY}
 COMPETITIONS = ["PL", "CL", "BL1", "PD", "FL1", "SA"]
 
 last_leaderboard_msg_id = None
+last_leaderboard_content = None  # embed dict (minus timestamp) of the last posted leaderboard
+
+PRED_EMOJI = {"home": "🏠", "draw": "🤝", "away": "✈️"}
+PRED_LABEL = {"home": "Home", "draw": "Draw", "away": "Away"}
+MEDALS = ("🥇", "🥈", "🥉")
 
 # ==== VOTES EMBED CREATION ====
-def create_live_predictions_embed(match_id, home_team, away_team, match_info=None):
-    """Create live predictions embed showing vote breakdown"""
-    votes = get_predictions_for_match(match_id)
-    total_votes = len(votes['home']) + len(votes['draw']) + len(votes['away'])
-    
-    if total_votes == 0:
-        home_pct = draw_pct = away_pct = 0
-    else:
-        home_pct = (len(votes['home']) / total_votes) * 100
-        draw_pct = (len(votes['draw']) / total_votes) * 100
-        away_pct = (len(votes['away']) / total_votes) * 100
-    
+# Bar strings for 0-100% in 5% steps, built once instead of on every embed refresh
+PERCENT_BARS = tuple("█" * i for i in range(21))
+
+def percent_bar(pct):
+    """Unicode bar for a percentage, "░" when empty"""
+    return PERCENT_BARS[min(20, int(pct / 5))] if pct > 0 else "░"
+
+# Thin separator sent as the second embed of every live predictions message
+MATCH_SEPARATOR_EMBED = discord.Embed(description="───────────────────────────────", color=discord.Color.dark_gray())
+
+# Live (unfinished) embeds by match_id; refreshes only rewrite the vote field values
+live_embed_cache = {}
+# repr of each live embed as last sent, so refreshes that change nothing skip the edit
+live_embed_sent = {}
+
+def create_live_predictions_embed_skeleton(home_team, away_team, match_info=None):
+    """Create the static parts of a live predictions embed: header, field names and footer"""
     # Check if match is finished and show score
     if match_info and match_info['status'] == 'FINISHED' and match_info['home_score'] is not None:
         title = "🏆 Final Result"
@@ -473,155 +1039,445 @@ def create_live_predictions_embed(match_id, home_team, away_team, match_info=Non
         color = discord.Color.green()
     
     embed = discord.Embed(title=title, description=description, color=color)
+    embed.add_field(name="🔮 Prediction Summary", value="\u200b", inline=False)
+    embed.add_field(name=f"🏠 {home_team} Win", value="\u200b", inline=False)
+    embed.add_field(name=f"🤝 Draw", value="\u200b", inline=False)
+    embed.add_field(name=f"✈️ {away_team} Win", value="\u200b", inline=False)
     
-    # Add prediction summary at top
-    embed.add_field(
-        name="🔮 Prediction Summary",
+    if match_info and match_info['status'] == 'FINISHED':
+        embed.set_footer(text="Match finished • Points awarded to correct predictions")
+    else:
+        embed.set_footer(text="Live tracking • Predictions update in real-time")
+    
+    return embed
+
+def create_live_predictions_embed(match_id, home_team, away_team, votes, match_info=None):
+    """Create live predictions embed showing the vote breakdown from get_predictions_for_match"""
+    total_votes = len(votes['home']) + len(votes['draw']) + len(votes['away'])
+    
+    if total_votes == 0:
+        home_pct = draw_pct = away_pct = 0
+    else:
+        home_pct = (len(votes['home']) / total_votes) * 100
+        draw_pct = (len(votes['draw']) / total_votes) * 100
+        away_pct = (len(votes['away']) / total_votes) * 100
+    
+    is_live = not (match_info and match_info['status'] == 'FINISHED')
+    embed = live_embed_cache.get(match_id) if is_live else None
+    if embed is None:
+        embed = create_live_predictions_embed_skeleton(home_team, away_team, match_info)
+        if is_live:
+            live_embed_cache[match_id] = embed
+        else:
+            live_embed_cache.pop(match_id, None)
+            live_embed_sent.pop(match_id, None)
+    
+    # Prediction summary at top
+    embed.set_field_at(
+        0, name=embed.fields[0].name,
         value=f"**{total_votes}** prediction{'s' if total_votes != 1 else ''} made",
         inline=False
     )
     
     # Home predictions with bar
-    home_bar = "█" * int(home_pct / 5) if home_pct > 0 else "░"
-    home_users = ", ".join(sorted(votes['home'])) if votes['home'] else "_No predictions yet_"
-    embed.add_field(
-        name=f"🏠 {home_team} Win",
+    home_bar = percent_bar(home_pct)
+    home_users = ", ".join(votes['home']) if votes['home'] else "_No predictions yet_"
+    embed.set_field_at(
+        1, name=embed.fields[1].name,
         value=f"`{home_bar}` **{home_pct:.0f}%** ({len(votes['home'])} votes)\n{home_users}",
         inline=False
     )
     
     # Draw predictions with bar
-    draw_bar = "█" * int(draw_pct / 5) if draw_pct > 0 else "░"
-    draw_users = ", ".join(sorted(votes['draw'])) if votes['draw'] else "_No predictions yet_"
-    embed.add_field(
-        name=f"🤝 Draw",
+    draw_bar = percent_bar(draw_pct)
+    draw_users = ", ".join(votes['draw']) if votes['draw'] else "_No predictions yet_"
+    embed.set_field_at(
+        2, name=embed.fields[2].name,
         value=f"`{draw_bar}` **{draw_pct:.0f}%** ({len(votes['draw'])} votes)\n{draw_users}",
         inline=False
     )
     
     # Away predictions with bar
-    away_bar = "█" * int(away_pct / 5) if away_pct > 0 else "░"
-    away_users = ", ".join(sorted(votes['away'])) if votes['away'] else "_No predictions yet_"
-    embed.add_field(
-        name=f"✈️ {away_team} Win",
+    away_bar = percent_bar(away_pct)
+    away_users = ", ".join(votes['away']) if votes['away'] else "_No predictions yet_"
+    embed.set_field_at(
+        3, name=embed.fields[3].name,
         value=f"`{away_bar}` **{away_pct:.0f}%** ({len(votes['away'])} votes)\n{away_users}",
         inline=False
     )
     
-    if match_info and match_info['status'] == 'FINISHED':
-        embed.set_footer(text="Match finished • Points awarded to correct predictions")
-    else:
-        embed.set_footer(text="Live tracking • Predictions update in real-time")
-    
     return embed
 
+# ==== DEBOUNCED LIVE PREDICTIONS EDITS ====
+LIVE_EDIT_DEBOUNCE_SECONDS = 1.5
+pending_live_edits = {}  # match_id -> asyncio.Task
+
+def schedule_live_predictions_refresh(channel, live_msg_id, match_id, home_team, away_team):
+    """Queue a live predictions edit, coalescing bursts of votes into a single edit"""
+    task = pending_live_edits.get(match_id)
+    if task and not task.done():
+        # The queued edit reads votes after its delay, so it will include this one
+        return
+    pending_live_edits[match_id] = asyncio.create_task(
+        _refresh_live_predictions(channel, live_msg_id, match_id, home_team, away_team)
+    )
+
+async def _refresh_live_predictions(channel, live_msg_id, match_id, home_team, away_team):
+    await asyncio.sleep(LIVE_EDIT_DEBOUNCE_SECONDS)
+    # Unregister before reading votes so later votes queue a fresh edit
+    pending_live_edits.pop(match_id, None)
+    try:
+        votes = await run_db(get_predictions_for_match, match_id)
+        embed = create_live_predictions_embed(match_id, home_team, away_team, votes)
+        # The cached embed is mutated in place, so compare a snapshot rather than the dict
+        content = repr(embed.to_dict())
+        if live_embed_sent.get(match_id) == content:
+            return
+        await channel.get_partial_message(live_msg_id).edit(embeds=[embed, MATCH_SEPARATOR_EMBED])
+        live_embed_sent[match_id] = content
+    except Exception as e:
+        print(f"Failed to update live predictions: {e}")
+
 # ==== GENERATE MATCH IMAGE ====
-async def generate_match_image(home_url, away_url):
-    async with aiohttp.ClientSession() as session:
-        home_img_bytes, away_img_bytes = None, None
-        try:
-            if home_url:
-                async with session.get(home_url, timeout=aiohttp.ClientTimeout(total=5)) as r:
-                    home_img_bytes = await r.read()
-        except Exception as e:
-            print(f"Failed to fetch home crest: {e}")
-        try:
-            if away_url:
-                async with session.get(away_url, timeout=aiohttp.ClientTimeout(total=5)) as r:
-                    away_img_bytes = await r.read()
-        except Exception as e:
-            print(f"Failed to fetch away crest: {e}")
-
-    size = (100, 100)
-    padding = 40
-    width = size[0]*2 + padding
-    height = size[1]
-    img = Image.new("RGBA", (width, height), (255, 255, 255, 0))
-    if home_img_bytes:
+CREST_SIZE = (100, 100)
+CREST_PADDING = 40
+# Blank transparent canvas built once at import and copied per match
+MATCH_IMAGE_CANVAS = Image.new("RGBA", (CREST_SIZE[0]*2 + CREST_PADDING, CREST_SIZE[1]), (255, 255, 255, 0))
+
+MAX_CREST_BYTES = 256 * 1024
+CREST_FETCH_ATTEMPTS = 3
+crest_download_semaphore = asyncio.Semaphore(8)
+
+async def fetch_crest_bytes(session, url):
+    """Download a crest, retrying network errors, 429 and 5xx with exponential backoff"""
+    for attempt in range(CREST_FETCH_ATTEMPTS):
         try:
-            home = Image.open(BytesIO(home_img_bytes)).convert("RGBA").resize(size)
-            img.paste(home, (0, 0), home)
-        except Exception as e:
-            print(f"Failed to process home crest image: {e}")
-    if away_img_bytes:
-        try:
-            away = Image.open(BytesIO(away_img_bytes)).convert("RGBA").resize(size)
-            img.paste(away, (size[0]+padding, 0), away)
-        except Exception as e:
-            print(f"Failed to process away crest image: {e}")
+            async with crest_download_semaphore:
+                return await _download_crest(session, url)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if attempt == CREST_FETCH_ATTEMPTS - 1:
+                raise
+            print(f"Retrying crest {url} after error: {e}")
+        await asyncio.sleep(2 ** attempt)
+
+async def _download_crest(session, url):
+    """Download a crest, returning None for non-image, unsupported or oversized responses"""
+    async with session.get(url, timeout=aiohttp.ClientTimeout(total=5)) as r:
+        if r.status == 429 or r.status >= 500:
+            r.raise_for_status()
+        content_type = r.headers.get("Content-Type", "")
+        if r.status != 200 or not content_type.startswith("image/"):
+            print(f"Skipping crest {url}: status {r.status}, type {content_type or 'unknown'}")
+            return None
+        if content_type.startswith("image/svg"):
+            # PIL can't decode SVG crests
+            return None
+        if r.content_length and r.content_length > MAX_CREST_BYTES:
+            print(f"Skipping crest {url}: {r.content_length} bytes")
+            return None
+        
+        data = bytearray()
+        async for chunk in r.content.iter_chunked(16 * 1024):
+            data += chunk
+            if len(data) > MAX_CREST_BYTES:
+                print(f"Skipping crest {url}: larger than {MAX_CREST_BYTES} bytes")
+                return None
+        return bytes(data)
+
+def open_crest(img_bytes):
+    """Decode crest bytes into a resized RGBA image"""
+    crest = Image.open(BytesIO(img_bytes))
+    if crest.mode != "RGBA":
+        crest = crest.convert("RGBA")
+    return crest.resize(CREST_SIZE, Image.Resampling.BILINEAR)
+
+# Decoded, resized crests by URL; teams play every week so these are reused constantly
+CREST_IMAGE_CACHE_MAX = 256
+crest_image_cache = {}
+# Crest URLs that can never be used (SVG, non-image, oversized, undecodable), so they aren't re-downloaded
+unusable_crest_urls = set()
+
+async def get_crest_image(session, url, side):
+    """Get a team's resized RGBA crest, downloading and decoding it only on first use"""
+    crest = crest_image_cache.get(url)
+    if crest is not None:
+        return crest
+    if url in unusable_crest_urls:
+        return None
+    
+    try:
+        img_bytes = await fetch_crest_bytes(session, url)
+    except Exception as e:
+        # Network errors, 429 and 5xx are transient, so the next post retries them
+        print(f"Failed to fetch {side} crest: {e}")
+        return None
+    if not img_bytes:
+        unusable_crest_urls.add(url)
+        return None
+    
+    try:
+        crest = await asyncio.to_thread(open_crest, img_bytes)
+    except Exception as e:
+        print(f"Failed to process {side} crest image: {e}")
+        unusable_crest_urls.add(url)
+        return None
+    
+    if len(crest_image_cache) >= CREST_IMAGE_CACHE_MAX:
+        crest_image_cache.pop(next(iter(crest_image_cache)))
+    crest_image_cache[url] = crest
+    return crest
+
+MATCH_IMAGE_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "crests")
+MATCH_IMAGE_CACHE_MAX_FILES = 500
+
+def match_image_cache_path(home_url, away_url):
+    """Path of the cached PNG for a crest URL pair"""
+    key = hashlib.sha1(f"{home_url}|{away_url}".encode()).hexdigest()
+    return os.path.join(MATCH_IMAGE_CACHE_DIR, f"{key}.png")
+
+def store_match_image(cache_path, png_bytes):
+    """Atomically write a generated image to the cache and evict the least recently used files"""
+    try:
+        os.makedirs(MATCH_IMAGE_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(png_bytes)
+        os.replace(tmp_path, cache_path)
+        
+        entries = [e for e in os.scandir(MATCH_IMAGE_CACHE_DIR) if e.name.endswith(".png")]
+        if len(entries) > MATCH_IMAGE_CACHE_MAX_FILES:
+            entries.sort(key=lambda e: e.stat().st_mtime)
+            for entry in entries[:len(entries) - MATCH_IMAGE_CACHE_MAX_FILES]:
+                os.remove(entry.path)
+    except OSError as e:
+        print(f"Failed to cache match image: {e}")
+
+# Recently generated PNGs by crest URL pair, in front of the disk cache
+MATCH_IMAGE_MEMORY_CACHE_MAX = 128
+match_image_bytes_cache = {}
+
+def remember_match_image(key, png_bytes):
+    """Keep a generated PNG in memory, evicting the least recently used pairing"""
+    match_image_bytes_cache.pop(key, None)
+    if len(match_image_bytes_cache) >= MATCH_IMAGE_MEMORY_CACHE_MAX:
+        match_image_bytes_cache.pop(next(iter(match_image_bytes_cache)))
+    match_image_bytes_cache[key] = png_bytes
+
+async def generate_match_image(home_url, away_url):
+    # Crest URLs are stable, so a generated image can be reused for the same pairing
+    key = (home_url, away_url)
+    cached = match_image_bytes_cache.get(key)
+    if cached is not None:
+        remember_match_image(key, cached)  # mark as recently used
+        return BytesIO(cached)
+    
+    cache_path = match_image_cache_path(home_url, away_url)
+    try:
+        with open(cache_path, "rb") as f:
+            cached = f.read()
+        os.utime(cache_path)  # mark as recently used
+        remember_match_image(key, cached)
+        return BytesIO(cached)
+    except OSError:
+        pass
+    
+    session = get_http_session()
+    
+    async def crest(url, side):
+        return await get_crest_image(session, url, side) if url else None
+    
+    # Download both crests concurrently; failures already come back as None
+    home, away = await asyncio.gather(crest(home_url, "home"), crest(away_url, "away"))
+
+    # Cache the image once each crest either loaded or is known to be unusable;
+    # a transiently failed crest leaves it uncached so the next post retries
+    def resolved(url, crest_image):
+        return crest_image is not None or not url or url in unusable_crest_urls
+    complete = resolved(home_url, home) and resolved(away_url, away)
+    # PNG encoding is CPU-bound, keep it off the event loop
+    png_bytes = await asyncio.to_thread(compose_match_image, home, away, cache_path if complete else None)
+    if complete:
+        remember_match_image(key, png_bytes)
+    return BytesIO(png_bytes)
+
+def compose_match_image(home, away, cache_path=None):
+    """Paste both crests onto a fresh canvas and encode it as PNG bytes, caching them if cache_path is set"""
+    # Crest slots are disjoint and the canvas is transparent, so a plain paste needs no alpha mask
+    img = MATCH_IMAGE_CANVAS.copy()
+    if home is not None:
+        img.paste(home, (0, 0))
+    if away is not None:
+        img.paste(away, (CREST_SIZE[0] + CREST_PADDING, 0))
     buffer = BytesIO()
     img.save(buffer, format="PNG")
-    buffer.seek(0)
-    return buffer
+    png_bytes = buffer.getvalue()
+    if cache_path:
+        store_match_image(cache_path, png_bytes)
+    return png_bytes
+
+async def prefetch_match_images(matches):
+    """Build crest images for several matches concurrently, keyed by match_id"""
+    async def build(match):
+        home_crest = match["homeTeam"].get("crest")
+        away_crest = match["awayTeam"].get("crest")
+        if not (home_crest or away_crest):
+            return None
+        try:
+            return await generate_match_image(home_crest, away_crest)
+        except Exception as e:
+            print(f"Failed to generate match image for {match['id']}: {e}")
+            return None
+    
+    buffers = await asyncio.gather(*(build(m) for m in matches))
+    return {str(m["id"]): buffer for m, buffer in zip(matches, buffers) if buffer}
 
 # ==== FETCH MATCHES ====
+@lru_cache(maxsize=512)
+def parse_utc_date(utc_date):
+    """Parse a football-data utcDate ("2024-08-17T14:00:00Z"), cached since kickoff slots repeat"""
+    return datetime.fromisoformat(utc_date.replace("Z", "+00:00"))
+
 async def fetch_matches(hours=24):
-    """Fetch matches within specified hours window"""
-    now = datetime.now(timezone.utc)
-    future = now + timedelta(hours=hours)
-    matches = []
-    
-    async with aiohttp.ClientSession() as session:
-        for comp in COMPETITIONS:
-            url = f"{BASE_URL}{comp}/matches?dateFrom={now.date()}&dateTo={future.date()}"
+    """Fetch matches within specified hours window, sharing recent results between callers"""
+    cached = fetch_matches_cache.get(hours)
+    if cached and time.monotonic() - cached[0] < FETCH_MATCHES_TTL:
+        return cached[1]
+    
+    # Only one fetch in flight; concurrent callers wait and reuse its result
+    async with fetch_matches_lock:
+        cached = fetch_matches_cache.get(hours)
+        if cached and time.monotonic() - cached[0] < FETCH_MATCHES_TTL:
+            return cached[1]
+        
+        matches = await _fetch_matches_uncached(hours)
+        fetch_matches_cache[hours] = (time.monotonic(), matches)
+        return matches
+
+API_MAX_ATTEMPTS = 3
+football_api_semaphore = asyncio.Semaphore(3)  # concurrent football-data requests
+
+async def fetch_football_data(session, url):
+    """GET a football-data endpoint, backing off on rate limits. Returns parsed JSON or None"""
+    for attempt in range(API_MAX_ATTEMPTS):
+        async with football_api_semaphore:
             try:
                 async with session.get(url, headers=HEADERS, timeout=aiohttp.ClientTimeout(total=10)) as resp:
                     if resp.status == 200:
-                        data = await resp.json()
-                        comp_name = data.get("competition", {}).get("name", comp)
-                        for m in data.get("matches", []):
-                            m["competition"]["name"] = comp_name
-                            matches.append(m)
-                    else:
-                        print(f"Failed to fetch {comp}: {resp.status}")
+                        return orjson.loads(await resp.read())
+                    if resp.status != 429:
+                        print(f"Failed to fetch {url}: {resp.status}")
+                        return None
+                    # football-data reports seconds until the request counter resets
+                    delay = int(resp.headers.get("X-RequestCounter-Reset", 10 * 2 ** attempt))
             except Exception as e:
-                print(f"Error fetching {comp}: {e}")
+                print(f"Error fetching {url}: {e}")
+                return None
+        
+        if attempt < API_MAX_ATTEMPTS - 1:
+            print(f"Rate limited on {url}, retrying in {delay}s...")
+            await asyncio.sleep(delay)
     
-    return [m for m in matches if now <= datetime.fromisoformat(m['utcDate'].replace("Z", "+00:00")) <= future]
+    print(f"Giving up on {url} after {API_MAX_ATTEMPTS} rate-limited attempts")
+    return None
 
-async def fetch_all_match_results():
-    """Fetch all match results and cache them"""
-    global match_results_cache, cache_timestamp
+async def _fetch_matches_uncached(hours):
+    """Fetch matches within specified hours window from the API"""
+    now = datetime.now(timezone.utc)
+    future = now + timedelta(hours=hours)
+    # utcDate is ISO-8601 UTC ("2024-08-17T14:00:00Z"), so string order matches time order
+    now_iso = now.strftime("%Y-%m-%dT%H:%M:%SZ")
+    future_iso = future.strftime("%Y-%m-%dT%H:%M:%SZ")
+    
+    async def fetch_competition(session, comp):
+        data = await fetch_football_data(session, f"{BASE_URL}{comp}/matches?dateFrom={now.date()}&dateTo={future.date()}")
+        if not data:
+            return []
+        comp_name = data.get("competition", {}).get("name", comp)
+        in_window = [m for m in data.get("matches", []) if now_iso <= m['utcDate'] <= future_iso]
+        for m in in_window:
+            m["competition"]["name"] = comp_name
+        return in_window
+    
+    session = get_http_session()
+    per_competition = await asyncio.gather(*(fetch_competition(session, comp) for comp in COMPETITIONS))
+    
+    return [m for comp_matches in per_competition for m in comp_matches]
+
+# In-flight result fetches by date_from, so overlapping callers share one round of API calls
+pending_result_fetches = {}
+
+async def fetch_all_match_results(date_from=None):
+    """Fetch finished match results, joining an identical fetch already in flight.
+    
+    With date_from, only finished matches from that date on are requested,
+    which keeps payloads bounded by the matches still awaiting results.
+    """
+    task = pending_result_fetches.get(date_from)
+    if task is None:
+        task = asyncio.create_task(_fetch_all_match_results(date_from))
+        pending_result_fetches[date_from] = task
+        task.add_done_callback(lambda _: pending_result_fetches.pop(date_from, None))
+    # A cancelled caller must not cancel the fetch the others are waiting on
+    return await asyncio.shield(task)
+
+async def _fetch_all_match_results(date_from):
+    query = ""
+    if date_from:
+        date_to = datetime.now(timezone.utc).date() + timedelta(days=1)
+        query = f"?status=FINISHED&dateFrom={date_from}&dateTo={date_to}"
+    
+    session = get_http_session()
+    responses = await asyncio.gather(*(fetch_football_data(session, f"{BASE_URL}{comp}/matches{query}") for comp in COMPETITIONS))
     
     results = {}
-    async with aiohttp.ClientSession() as session:
-        for i, comp in enumerate(COMPETITIONS):
-            url = f"{BASE_URL}{comp}/matches"
-            try:
-                async with session.get(url, headers=HEADERS, timeout=aiohttp.ClientTimeout(total=10)) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        for m in data.get("matches", []):
-                            if m.get("status") == "FINISHED":
-                                match_id = str(m["id"])
-                                winner = m.get("score", {}).get("winner")
-                                home_score = m.get("score", {}).get("fullTime", {}).get("home")
-                                away_score = m.get("score", {}).get("fullTime", {}).get("away")
-                                
-                                if winner:
-                                    result_map = {"HOME_TEAM": "home", "AWAY_TEAM": "away", "DRAW": "draw"}
-                                    results[match_id] = {
-                                        "result": result_map.get(winner, winner.lower()),
-                                        "home_score": home_score,
-                                        "away_score": away_score
-                                    }
-                    elif resp.status == 429:
-                        print(f"Rate limited! Waiting 60 seconds...")
-                        await asyncio.sleep(60)
-                        continue
-                    else:
-                        print(f"Failed to fetch results for {comp}: {resp.status}")
-            except Exception as e:
-                print(f"Error fetching results for {comp}: {e}")
-            
-            # Add delay between API calls to avoid rate limiting
-            if i < len(COMPETITIONS) - 1:
-                await asyncio.sleep(1)
+    result_map = {"HOME_TEAM": "home", "AWAY_TEAM": "away", "DRAW": "draw"}
+    for data in responses:
+        if not data:
+            continue
+        for m in data.get("matches", []):
+            if m.get("status") == "FINISHED":
+                match_id = str(m["id"])
+                winner = m.get("score", {}).get("winner")
+                home_score = m.get("score", {}).get("fullTime", {}).get("home")
+                away_score = m.get("score", {}).get("fullTime", {}).get("away")
+                
+                if winner:
+                    results[match_id] = {
+                        "result": result_map.get(winner, winner.lower()),
+                        "home_score": home_score,
+                        "away_score": away_score
+                    }
     
-    match_results_cache = results
-    cache_timestamp = datetime.now(timezone.utc)
     return results
 
+# ==== RECENT VOTES ====
+RECENT_VOTE_TTL = 3600  # seconds
+RECENT_VOTES_MAX = 10000
+recent_votes = {}  # (user_id, match_id) -> (category, kickoff, monotonic expiry)
+
+def remember_vote(user_id, match_id, category, kickoff):
+    """Remember a user's current vote and the match kickoff so duplicate clicks can be answered without SQL"""
+    key = (user_id, match_id)
+    recent_votes.pop(key, None)
+    if len(recent_votes) >= RECENT_VOTES_MAX:
+        recent_votes.pop(next(iter(recent_votes)))
+    recent_votes[key] = (category, kickoff, time.monotonic() + RECENT_VOTE_TTL)
+
+def recalled_vote(user_id, match_id):
+    """Get a remembered (category, kickoff) vote, or None if unknown or expired"""
+    entry = recent_votes.get((user_id, match_id))
+    if entry and entry[2] > time.monotonic():
+        return entry[:2]
+    return None
+
+def forget_vote(user_id, match_id):
+    recent_votes.pop((user_id, match_id), None)
+
+def forget_match_votes(match_id):
+    """Drop remembered votes for a match whose voting has closed"""
+    for key in [key for key in recent_votes if key[1] == match_id]:
+        del recent_votes[key]
+
 # ==== VOTE BUTTON ====
 class VoteButton(Button):
     def __init__(self, label, category, match_id):
@@ -641,67 +1497,46 @@ class VoteButton(Button):
             print(f"Failed to defer: {e}")
             return
         
-        # Now we can take our time with database operations
-        match_info = get_match_info(self.match_id)
-        if not match_info:
-            await interaction.followup.send("Match not found!", ephemeral=True)
-            return
-        
-        match_time = match_info['match_time']
-        if match_time.tzinfo is None:
-            match_time = match_time.replace(tzinfo=timezone.utc)
-        
-        now = datetime.now(timezone.utc)
-        if now >= match_time:
-            await interaction.followup.send("Voting for this match has ended!", ephemeral=True)
-            return
-        
         user = interaction.user
         user_id = str(user.id)
         match_id = self.match_id
+        now = datetime.now(timezone.utc)
         
-        # Check if user already has a prediction
-        existing_prediction = get_user_prediction(user_id, match_id)
-        
-        if existing_prediction:
-            if existing_prediction == self.category:
-                await interaction.followup.send(f"You already voted for **{self.label}**!", ephemeral=True)
-                return
+        # Repeat taps on the same button don't need the database
+        recalled = recalled_vote(user_id, match_id)
+        if recalled and recalled[0] == self.category:
+            # Kickoff wins over "already voted" when the view outlives the start
+            if now >= recalled[1]:
+                await interaction.followup.send("Voting for this match has ended!", ephemeral=True)
             else:
-                # Update prediction
-                upsert_user(user_id, user.name)
-                update_prediction(user_id, match_id, self.category)
-                
-                # Update live predictions embed
-                if match_info:
-                    live_msg_id = get_live_predictions_message_id(match_id)
-                    if live_msg_id:
-                        try:
-                            live_message = await interaction.channel.fetch_message(live_msg_id)
-                            embed = create_live_predictions_embed(match_id, match_info['home_team'], match_info['away_team'])
-                            await live_message.edit(embed=embed)
-                        except Exception as e:
-                            print(f"Failed to update live predictions: {e}")
-                
-                await interaction.followup.send(f"Changed your vote to **{self.label}**!", ephemeral=True)
-                return
+                await interaction.followup.send(f"You already voted for **{self.label}**!", ephemeral=True)
+            return
         
-        # New prediction
-        upsert_user(user_id, user.name)
-        add_prediction(user_id, match_id, self.category)
+        # One round trip: check the match, save the vote and fetch what we need to reply
+        vote = await run_db(record_vote, user_id, user.name, match_id, self.category, now)
+        if not vote:
+            await interaction.followup.send("Match not found!", ephemeral=True)
+            return
+        
+        if now >= vote['match_time']:
+            await interaction.followup.send("Voting for this match has ended!", ephemeral=True)
+            return
+        
+        remember_vote(user_id, match_id, self.category, vote['match_time'])
+        previous_prediction = vote['previous_prediction']
+        if previous_prediction == self.category:
+            await interaction.followup.send(f"You already voted for **{self.label}**!", ephemeral=True)
+            return
         
         # Update live predictions embed
-        if match_info:
-            live_msg_id = get_live_predictions_message_id(match_id)
-            if live_msg_id:
-                try:
-                    live_message = await interaction.channel.fetch_message(live_msg_id)
-                    embed = create_live_predictions_embed(match_id, match_info['home_team'], match_info['away_team'])
-                    await live_message.edit(embed=embed)
-                except Exception as e:
-                    print(f"Failed to update live predictions: {e}")
+        live_msg_id = vote['live_predictions_msg_id']
+        if live_msg_id:
+            schedule_live_predictions_refresh(interaction.channel, live_msg_id, match_id, vote['home_team'], vote['away_team'])
         
-        await interaction.followup.send(f"You voted for **{self.label}**!", ephemeral=True)
+        if previous_prediction:
+            await interaction.followup.send(f"Changed your vote to **{self.label}**!", ephemeral=True)
+        else:
+            await interaction.followup.send(f"You voted for **{self.label}**!", ephemeral=True)
 
 # ==== PERSISTENT VOTE VIEW ====
 class PersistentVoteView(View):
@@ -712,13 +1547,36 @@ class PersistentVoteView(View):
             self.add_item(VoteButton("🤝 Draw", "draw", match_id))
             self.add_item(VoteButton("✈️ Away", "away", match_id))
 
+# Live vote views by match_id, stopped once voting closes so discord.py drops them
+active_vote_views = {}
+
+def release_vote_view(match_id):
+    """Stop and forget the vote view of a match whose voting has closed"""
+    view = active_vote_views.pop(match_id, None)
+    if view:
+        view.stop()
+    forget_match_votes(match_id)
+
 # ==== POST MATCH ==== (continued)
-async def post_match(match):
+def format_countdown(time_until):
+    """Format the time until kickoff as days, hours or minutes"""
+    # total_seconds keeps whole days in the count; .seconds alone wraps every 24h
+    total = max(0, int(time_until.total_seconds()))
+    days, rem = divmod(total, 86400)
+    hours, rem = divmod(rem, 3600)
+    
+    if days > 0:
+        return f"⏰ in {days} day{'s' if days != 1 else ''}"
+    if hours > 0:
+        return f"⏰ in ~{hours} hours"
+    return f"⏰ in {rem // 60} minutes"
+
+async def post_match(match, image_buffer=None):
     match_id = str(match["id"])
     if is_match_posted(match_id):
         return
     
-    match_time = datetime.fromisoformat(match['utcDate'].replace("Z", "+00:00"))
+    match_time = parse_utc_date(match['utcDate'])
     if match_time < datetime.now(timezone.utc):
         return
     
@@ -738,17 +1596,7 @@ async def post_match(match):
     
     # Calculate time until kickoff
     now = datetime.now(timezone.utc)
-    time_until = match_time - now
-    days = time_until.days
-    hours = time_until.seconds // 3600
-    
-    if days > 0:
-        countdown = f"⏰ in {days} day{'s' if days != 1 else ''}"
-    elif hours > 0:
-        countdown = f"⏰ in ~{hours + (days * 24)} hours"
-    else:
-        mins = time_until.seconds // 60
-        countdown = f"⏰ in {mins} minutes"
+    countdown = format_countdown(match_time - now)
     
     embed = discord.Embed(
         title=f"⚽ {home_team} vs {away_team}",
@@ -796,153 +1644,70 @@ async def post_match(match):
     file = None
     if home_crest or away_crest:
         try:
-            image_buffer = await generate_match_image(home_crest, away_crest)
+            if image_buffer is None:
+                image_buffer = await generate_match_image(home_crest, away_crest)
             file = discord.File(fp=image_buffer, filename="match.png")
             embed.set_image(url="attachment://match.png")
         except Exception as e:
             print(f"Failed to generate match image: {e}")
     
     view = PersistentVoteView(match_id)
-    
-    try:
-        match_message = await channel.send(embed=embed, file=file, view=view)
-        save_vote_message(match_id, match_message.id)
-        
-        # Post live predictions embed below
-        live_embed = create_live_predictions_embed(match_id, home_team, away_team)
-        live_message = await channel.send(embed=live_embed)
-        save_live_predictions_message(match_id, live_message.id)
-        
-        # Add thin separator after each match
-        separator_line = discord.Embed(description="───────────────────────────────", color=discord.Color.dark_gray())
-        await channel.send(embed=separator_line)
-        
-        mark_match_posted(match_id, home_team, away_team, match_time, competition)
-    except Exception as e:
-        print(f"Failed to post match {match_id}: {e}")
-
-# ==== UPDATE MATCH RESULTS ====
-@tasks.loop(minutes=10)
-async def update_match_results():
-    global last_leaderboard_msg_id
-    leaderboard_changed = False
-    
-    with db_connection() as conn:
-        cur = conn.cursor()
-        cur.execute("SELECT user_id, points FROM users")
-        previous_points = {row['user_id']: row['points'] for row in cur.fetchall()}
-    
-    # Only fetch results if we have unprocessed matches
-    with db_connection() as conn:
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT COUNT(*) as count FROM posted_matches pm
-            WHERE pm.status != 'FINISHED'
-            AND pm.match_time < NOW()
-            AND NOT EXISTS (
-                SELECT 1 FROM processed_matches proc WHERE proc.match_id = pm.match_id
-            )
-        """)
-        unprocessed_count = cur.fetchone()['count']
-    
-    if unprocessed_count == 0:
-        # No pending matches to check, skip API calls
-        return
-    
-    results = await fetch_all_match_results()
-    
-    for match_id, result_data in results.items():
-        # Skip if already processed
-        if is_match_processed(match_id):
-            continue
-        
-        result = result_data['result']
-        home_score = result_data.get('home_score')
-        away_score = result_data.get('away_score')
-        
-        # Update match score in database
-        if home_score is not None and away_score is not None:
-            update_match_score(match_id, home_score, away_score, 'FINISHED')
-        
-        # Award points
-        with db_connection() as conn:
-            cur = conn.cursor()
-            cur.execute("""
-                SELECT user_id FROM predictions
-                WHERE match_id = %s AND prediction = %s
-            """, (match_id, result))
-            winners = cur.fetchall()
-        
-        for winner in winners:
-            add_points(winner['user_id'], 1)
-            update_user_streak(winner['user_id'], is_correct=True)
-            record_weekly_stat(winner['user_id'], is_correct=True)
-            leaderboard_changed = True
-        
-        # Update streaks for losers
-        with db_connection() as conn:
-            cur = conn.cursor()
-            cur.execute("""
-                SELECT DISTINCT user_id FROM predictions
-                WHERE match_id = %s AND prediction != %s
-            """, (match_id, result))
-            losers = cur.fetchall()
-        
-        for loser in losers:
-            update_user_streak(loser['user_id'], is_correct=False)
-            record_weekly_stat(loser['user_id'], is_correct=False)
-        
-        # Mark match as processed
-        mark_match_processed(match_id)
-        
-        # Update vote message to show result
-        vote_msg = get_vote_message_id(match_id)
-        if vote_msg and not vote_msg['buttons_disabled']:
-            try:
-                channel = bot.get_channel(MATCH_CHANNEL_ID)
-                votes_message = await channel.fetch_message(vote_msg['votes_msg_id'])
-                
-                # Create disabled view with NEW buttons
-                disabled_view = View(timeout=None)
-                home_btn = Button(label="🏠 Home", style=discord.ButtonStyle.secondary, disabled=True)
-                draw_btn = Button(label="🤝 Draw", style=discord.ButtonStyle.secondary, disabled=True)
-                away_btn = Button(label="✈️ Away", style=discord.ButtonStyle.secondary, disabled=True)
-                
-                disabled_view.add_item(home_btn)
-                disabled_view.add_item(draw_btn)
-                disabled_view.add_item(away_btn)
-                
-                await votes_message.edit(view=disabled_view)
-                disable_vote_buttons(match_id)
-            except discord.errors.NotFound:
-                disable_vote_buttons(match_id)
-            except Exception as e:
-                print(f"Failed to update vote buttons for {match_id}: {e}")
+    
+    try:
+        match_message = await channel.send(embed=embed, file=file, view=view)
+        active_vote_views[match_id] = view
         
-        # Update live predictions to show final score
-        match_info = get_match_info(match_id)
-        if match_info:
-            live_msg_id = get_live_predictions_message_id(match_id)
-            if live_msg_id:
-                try:
-                    channel = bot.get_channel(MATCH_CHANNEL_ID)
-                    live_message = await channel.fetch_message(live_msg_id)
-                    embed = create_live_predictions_embed(match_id, match_info['home_team'], 
-                                                         match_info['away_team'], match_info)
-                    await live_message.edit(embed=embed)
-                except Exception as e:
-                    print(f"Failed to update final score for {match_id}: {e}")
+        # Post live predictions embed below, with the separator in the same message
+        votes = await run_db(get_predictions_for_match, match_id)
+        live_embed = create_live_predictions_embed(match_id, home_team, away_team, votes)
+        live_message = await channel.send(embeds=[live_embed, MATCH_SEPARATOR_EMBED])
         
-        # Check for streak milestones and notify
-        if winners:
-            await check_streak_milestones(winners)
+        await run_db(record_posted_match, match_id, home_team, away_team, match_time, competition,
+                     match_message.id, live_message.id)
+        schedule_kickoff_disable(match_id, match_time)
+    except Exception as e:
+        print(f"Failed to post match {match_id}: {e}")
+
+# ==== UPDATE MATCH RESULTS ====
+@tasks.loop(minutes=10)
+async def update_match_results():
+    global last_leaderboard_msg_id, last_leaderboard_content
+    
+    # Only fetch results if we have unprocessed matches
+    snapshot = await run_db(get_pending_results_snapshot)
+    if snapshot is None:
+        # No pending matches to check, skip API calls
+        return
+    earliest_unprocessed, previous_points = snapshot
+    
+    # Only ask for results since the oldest pending kickoff (a day early to absorb timezone skew)
+    results = await fetch_all_match_results(date_from=(earliest_unprocessed - timedelta(days=1)).date())
+    
+    new_results = {match_id: result_data for match_id, result_data in results.items()
+                   if not is_match_processed(match_id)}
+    if not new_results:
+        return
+    
+    # Scores, points, streaks, weekly stats and processed flags for the whole batch at once
+    leaderboard_changed, streak_alerts = await run_db(apply_match_results, new_results)
+    
+    # Edit every finished match's messages concurrently, bounded by the edit semaphore
+    match_channel = bot.get_channel(MATCH_CHANNEL_ID)
+    match_messages = await run_db(get_match_messages, new_results)
+    await asyncio.gather(*(finalize_match_messages(match_channel, match_id, match_info)
+                           for match_id, match_info in match_messages.items()))
+    
+    # Notify streak milestones reached in this batch
+    await check_streak_milestones(streak_alerts)
     
     if leaderboard_changed:
         channel = bot.get_channel(LEADERBOARD_CHANNEL_ID)
         if not channel:
             return
         
-        leaderboard = get_leaderboard()
+        leaderboard = await run_db(get_top_leaderboard, 10)
+        stats = await run_db(get_leaderboard_stats, [entry['user_id'] for entry in leaderboard[:3]])
+        prediction_counts = stats['prediction_counts']
         
         # Create enhanced leaderboard embed
         embed = discord.Embed(
@@ -953,30 +1718,23 @@ async def update_match_results():
         
         # Top 3 with special formatting
         if len(leaderboard) >= 1:
-            medals = ["🥇", "🥈", "🥉"]
             top_3_lines = []
             
             for i in range(min(3, len(leaderboard))):
                 entry = leaderboard[i]
                 diff = entry['points'] - previous_points.get(entry['user_id'], 0)
                 
-                # Get user stats
-                with db_connection() as conn:
-                    cur = conn.cursor()
-                    cur.execute("SELECT COUNT(*) as total FROM predictions WHERE user_id = %s", (entry['user_id'],))
-                    total_preds = cur.fetchone()['total']
+                total_preds = prediction_counts.get(entry['user_id'], 0)
                 
                 accuracy = (entry['points'] / total_preds * 100) if total_preds > 0 else 0
                 
                 # Show point gain
                 gain_text = f" `+{diff}`" if diff > 0 else ""
                 
-                # Get streak
-                streaks = get_user_streaks(entry['user_id'])
-                streak_text = f" 🔥 {streaks['current_streak']}" if streaks['current_streak'] >= 3 else ""
+                streak_text = f" 🔥 {entry['current_streak']}" if entry['current_streak'] >= 3 else ""
                 
                 top_3_lines.append(
-                    f"{medals[i]} **{entry['username']}**{gain_text}{streak_text}\n"
+                    f"{MEDALS[i]} **{entry['username']}**{gain_text}{streak_text}\n"
                     f"└ {entry['points']} pts • {accuracy:.0f}% accuracy"
                 )
             
@@ -1003,25 +1761,25 @@ async def update_match_results():
                 )
         
         # Stats footer
-        total_players = len(leaderboard)
-        total_points_awarded = sum(e['points'] for e in leaderboard)
-        
-        with db_connection() as conn:
-            cur = conn.cursor()
-            cur.execute("SELECT COUNT(*) as total FROM predictions")
-            total_predictions = cur.fetchone()['total']
+        total_players = stats['players']
+        total_points_awarded = stats['points']
+        total_predictions = stats['predictions']
         
         embed.set_footer(
             text=f"👥 {total_players} players • 🎯 {total_predictions} predictions • 🏅 {total_points_awarded} points awarded"
         )
         
+        # Skip the edit when nothing visible changed since the last post
+        leaderboard_content = embed.to_dict()
+        if last_leaderboard_msg_id and leaderboard_content == last_leaderboard_content:
+            return
+        
         # Add timestamp
         embed.timestamp = datetime.now(timezone.utc)
         
         try:
             if last_leaderboard_msg_id:
-                msg = await channel.fetch_message(last_leaderboard_msg_id)
-                await msg.edit(embed=embed)
+                await channel.get_partial_message(last_leaderboard_msg_id).edit(embed=embed)
             else:
                 msg = await channel.send(embed=embed)
                 last_leaderboard_msg_id = msg.id
@@ -1029,36 +1787,61 @@ async def update_match_results():
             print(f"Failed to update leaderboard: {e}")
             msg = await channel.send(embed=embed)
             last_leaderboard_msg_id = msg.id
+        last_leaderboard_content = leaderboard_content
+
+# Discord rate limits per route; keep a handful of message edits in flight at once
+DISCORD_EDIT_CONCURRENCY = 5
+discord_edit_semaphore = asyncio.Semaphore(DISCORD_EDIT_CONCURRENCY)
+
+async def finalize_match_messages(channel, match_id, match_info):
+    """Disable a finished match's vote buttons and show the final score on its live predictions"""
+    async with discord_edit_semaphore:
+        # Update vote message to show result
+        if match_info['votes_msg_id'] and not match_info['buttons_disabled']:
+            await disable_match_buttons(channel, match_id, match_info['votes_msg_id'])
+        
+        # Update live predictions to show final score
+        live_msg_id = match_info['live_predictions_msg_id']
+        if live_msg_id:
+            try:
+                votes = await run_db(get_predictions_for_match, match_id)
+                embed = create_live_predictions_embed(match_id, match_info['home_team'], 
+                                                     match_info['away_team'], votes, match_info)
+                # Edit by ID, no need to fetch the message first
+                await channel.get_partial_message(live_msg_id).edit(embeds=[embed, MATCH_SEPARATOR_EMBED])
+            except Exception as e:
+                print(f"Failed to update final score for {match_id}: {e}")
 
-async def check_streak_milestones(winners):
-    """Check if any winners hit streak milestones and notify"""
+async def check_streak_milestones(streak_alerts):
+    """Announce win streak milestones as (username, streak) pairs"""
+    if not streak_alerts:
+        return
+    
     channel = bot.get_channel(MATCH_CHANNEL_ID)
     if not channel:
         return
     
-    for winner in winners:
-        streaks = get_user_streaks(winner['user_id'])
-        current = streaks['current_streak']
-        
-        # Notify on milestones: 3, 5, 10, 15, 20, etc.
-        if current in [3, 5, 10, 15, 20, 25, 30]:
-            user_data = get_user(winner['user_id'])
-            if user_data:
-                try:
-                    embed = discord.Embed(
-                        title=f"🔥 Streak Alert!",
-                        description=f"**{user_data['username']}** is on fire with a **{current}-game win streak!**",
-                        color=discord.Color.orange()
-                    )
-                    await channel.send(embed=embed)
-                except Exception as e:
-                    print(f"Failed to send streak notification: {e}")
+    embeds = [
+        discord.Embed(
+            title=f"🔥 Streak Alert!",
+            description=f"**{username}** is on fire with a **{current}-game win streak!**",
+            color=discord.Color.orange()
+        )
+        for username, current in streak_alerts
+    ]
+    
+    # Discord allows up to 10 embeds per message, so a batch of alerts needs only a few sends
+    for i in range(0, len(embeds), 10):
+        try:
+            await channel.send(embeds=embeds[i:i + 10])
+        except Exception as e:
+            print(f"Failed to send streak notification: {e}")
 
 # ==== MATCH NOTIFICATIONS ====
 @tasks.loop(minutes=2)
 async def send_match_notifications():
     """Send notifications for matches starting soon"""
-    matches = get_upcoming_matches_for_notification()
+    matches = await run_db(get_upcoming_matches_for_notification)
     
     if not matches:
         return
@@ -1067,22 +1850,17 @@ async def send_match_notifications():
     if not channel:
         return
     
+    # Users who haven't voted, for every match in one query
+    non_voters_by_match = await run_db(get_non_voters, [match['match_id'] for match in matches])
+    
     for match in matches:
-        # Get users who haven't voted
-        with db_connection() as conn:
-            cur = conn.cursor()
-            cur.execute("""
-                SELECT u.user_id, u.username
-                FROM users u
-                WHERE NOT EXISTS (
-                    SELECT 1 FROM predictions p 
-                    WHERE p.user_id = u.user_id AND p.match_id = %s
-                )
-            """, (match['match_id'],))
-            non_voters = cur.fetchall()
+        non_voters = non_voters_by_match[match['match_id']]
         
-        if non_voters and len(non_voters) > 0:
-            mentions = " ".join([f"<@{user['user_id']}>" for user in non_voters[:10]])
+        if non_voters["total"] > 0:
+            # Only ping everyone when the whole list fits in one message
+            mentions = None
+            if non_voters["total"] <= 10:
+                mentions = " ".join(f"<@{user_id}>" for user_id in non_voters["user_ids"])
             
             embed = discord.Embed(
                 title="⏰ Match Starting Soon!",
@@ -1091,35 +1869,78 @@ async def send_match_notifications():
             )
             embed.add_field(
                 name="🔮 Haven't Voted Yet",
-                value=f"{len(non_voters)} player(s) haven't made predictions!",
+                value=f"{non_voters['total']} player(s) haven't made predictions!",
                 inline=False
             )
             
             try:
-                await channel.send(content=mentions if len(non_voters) <= 10 else None, embed=embed)
+                await channel.send(content=mentions, embed=embed)
             except Exception as e:
                 print(f"Failed to send notification: {e}")
-        
-        mark_notification_sent(match['match_id'])
+    
+    await run_db(mark_notifications_sent, [match['match_id'] for match in matches])
 
 # ==== DISABLE BUTTONS AT KICKOFF ====
-@tasks.loop(minutes=2)
-async def disable_buttons_at_kickoff():
-    """Disable voting buttons for matches that have started"""
-    now = datetime.now(timezone.utc)
+disabled_vote_view = None
+
+def get_disabled_vote_view():
+    """Get the shared view of greyed-out vote buttons, built on first use"""
+    global disabled_vote_view
+    if disabled_vote_view is None:
+        view = View(timeout=None)
+        view.add_item(Button(label="🏠 Home", style=discord.ButtonStyle.secondary, disabled=True))
+        view.add_item(Button(label="🤝 Draw", style=discord.ButtonStyle.secondary, disabled=True))
+        view.add_item(Button(label="✈️ Away", style=discord.ButtonStyle.secondary, disabled=True))
+        # Nothing to dispatch; a stopped view is never added to the view store, so one instance serves every edit
+        view.stop()
+        disabled_vote_view = view
+    return disabled_vote_view
+
+async def disable_match_buttons(channel, match_id, votes_msg_id):
+    """Replace a match's vote buttons with disabled ones, returns True if the message was edited"""
+    try:
+        votes_message = channel.get_partial_message(votes_msg_id)
+        await votes_message.edit(view=get_disabled_vote_view())
+        await run_db(disable_vote_buttons, match_id)
+        release_vote_view(match_id)
+        return True
+    except discord.errors.NotFound:
+        await run_db(disable_vote_buttons, match_id)
+        release_vote_view(match_id)
+    except Exception as e:
+        print(f"Failed to disable buttons for {match_id}: {e}")
+    return False
+
+async def disable_buttons_for_match(match_id):
+    """Disable voting buttons for a single match (runs at its kickoff)"""
+    vote_msg = await run_db(get_vote_message_id, match_id)
+    if not vote_msg or vote_msg['buttons_disabled']:
+        return
     
-    with db_connection() as conn:
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT vd.match_id, vd.votes_msg_id, pm.home_team, pm.away_team
-            FROM vote_data vd
-            JOIN posted_matches pm ON vd.match_id = pm.match_id
-            WHERE pm.match_time <= %s
-            AND pm.match_time > %s
-            AND vd.buttons_disabled = FALSE
-            AND pm.status != 'FINISHED'
-        """, (now, now - timedelta(minutes=5)))
-        matches = cur.fetchall()
+    channel = bot.get_channel(MATCH_CHANNEL_ID)
+    if not channel:
+        return
+    
+    if await disable_match_buttons(channel, match_id, vote_msg['votes_msg_id']):
+        print(f"Disabled buttons at kickoff for match {match_id}")
+
+def schedule_kickoff_disable(match_id, match_time):
+    """Schedule a match's voting buttons to be disabled exactly at kickoff"""
+    scheduler.add_job(
+        disable_buttons_for_match, "date",
+        run_date=match_time, args=[match_id],
+        id=f"disable_{match_id}", replace_existing=True, misfire_grace_time=300
+    )
+
+def schedule_upcoming_kickoffs():
+    """Re-create kickoff jobs for posted matches that haven't started (e.g. after a restart)"""
+    for match in get_unstarted_matches():
+        schedule_kickoff_disable(match['match_id'], match['match_time'])
+
+@tasks.loop(minutes=10)
+async def disable_buttons_at_kickoff():
+    """Fallback for started matches whose kickoff job didn't run"""
+    matches = await run_db(get_started_enabled_matches, datetime.now(timezone.utc))
     
     if not matches:
         return
@@ -1129,27 +1950,44 @@ async def disable_buttons_at_kickoff():
         return
     
     for match in matches:
+        if await disable_match_buttons(channel, match['match_id'], match['votes_msg_id']):
+            print(f"Disabled buttons for started match: {match['home_team']} vs {match['away_team']}")
+
+# ==== WEEKLY RECAP ====
+# DMs open a channel per user; keep a handful in flight to stay clear of the global rate limit
+WEEKLY_DM_CONCURRENCY = 3
+weekly_dm_semaphore = asyncio.Semaphore(WEEKLY_DM_CONCURRENCY)
+
+async def send_weekly_dm(user_stat, rank, total_players):
+    """DM a user their stats and rank for last week"""
+    async with weekly_dm_semaphore:
         try:
-            votes_message = await channel.fetch_message(match['votes_msg_id'])
-            
-            disabled_view = View(timeout=None)
-            home_btn = Button(label="🏠 Home", style=discord.ButtonStyle.secondary, disabled=True)
-            draw_btn = Button(label="🤝 Draw", style=discord.ButtonStyle.secondary, disabled=True)
-            away_btn = Button(label="✈️ Away", style=discord.ButtonStyle.secondary, disabled=True)
+            # Cached members need no API call
+            user_id = int(user_stat['user_id'])
+            user = bot.get_user(user_id) or await bot.fetch_user(user_id)
+            accuracy = (user_stat['correct'] / user_stat['total'] * 100)
             
-            disabled_view.add_item(home_btn)
-            disabled_view.add_item(draw_btn)
-            disabled_view.add_item(away_btn)
+            dm_embed = discord.Embed(
+                title="📊 Your Week in Review",
+                description=f"Here's how you did last week!",
+                color=discord.Color.blue()
+            )
+            dm_embed.add_field(
+                name="🎯 Your Stats",
+                value=f"**Correct:** {user_stat['correct']}/{user_stat['total']}\n"
+                      f"**Accuracy:** {accuracy:.1f}%",
+                inline=False
+            )
+            dm_embed.add_field(
+                name="🏅 Weekly Rank",
+                value=f"#{rank} out of {total_players} players",
+                inline=False
+            )
             
-            await votes_message.edit(view=disabled_view)
-            disable_vote_buttons(match['match_id'])
-            print(f"Disabled buttons for started match: {match['home_team']} vs {match['away_team']}")
-        except discord.errors.NotFound:
-            disable_vote_buttons(match['match_id'])
+            await user.send(embed=dm_embed)
         except Exception as e:
-            print(f"Failed to disable buttons for {match['match_id']}: {e}")
+            print(f"Failed to send DM to user {user_stat['user_id']}: {e}")
 
-# ==== WEEKLY RECAP ====
 @tasks.loop(hours=24)
 async def weekly_recap():
     """Send weekly recap every Monday"""
@@ -1159,7 +1997,7 @@ async def weekly_recap():
     if now.weekday() != 0:
         return
     
-    last_week_stats = get_last_week_stats()
+    last_week_stats = await run_db(get_last_week_stats)
     
     if not last_week_stats:
         return
@@ -1179,8 +2017,7 @@ async def weekly_recap():
     top_text = []
     for i, user in enumerate(top_5):
         accuracy = (user['correct'] / user['total'] * 100) if user['total'] > 0 else 0
-        medals = ["🥇", "🥈", "🥉", "4.", "5."]
-        medal = medals[i] if i < len(medals) else f"{i+1}."
+        medal = MEDALS[i] if i < len(MEDALS) else f"{i+1}."
         top_text.append(f"{medal} **{user['username']}** — {user['correct']}/{user['total']} ({accuracy:.0f}%)")
     
     embed.add_field(
@@ -1202,37 +2039,12 @@ async def weekly_recap():
         inline=False
     )
     
-    # Individual DMs to active users
-    for user_stat in last_week_stats:
-        if user_stat['total'] >= 3:
-            try:
-                user = await bot.fetch_user(int(user_stat['user_id']))
-                accuracy = (user_stat['correct'] / user_stat['total'] * 100)
-                
-                dm_embed = discord.Embed(
-                    title="📊 Your Week in Review",
-                    description=f"Here's how you did last week!",
-                    color=discord.Color.blue()
-                )
-                dm_embed.add_field(
-                    name="🎯 Your Stats",
-                    value=f"**Correct:** {user_stat['correct']}/{user_stat['total']}\n"
-                          f"**Accuracy:** {accuracy:.1f}%",
-                    inline=False
-                )
-                
-                # Rank
-                rank = next((i+1 for i, u in enumerate(last_week_stats) if u['user_id'] == user_stat['user_id']), None)
-                if rank:
-                    dm_embed.add_field(
-                        name="🏅 Weekly Rank",
-                        value=f"#{rank} out of {len(last_week_stats)} players",
-                        inline=False
-                    )
-                
-                await user.send(embed=dm_embed)
-            except Exception as e:
-                print(f"Failed to send DM to user {user_stat['user_id']}: {e}")
+    # Individual DMs to active users, a few at a time
+    await asyncio.gather(*(
+        send_weekly_dm(user_stat, rank, len(last_week_stats))
+        for rank, user_stat in enumerate(last_week_stats, start=1)
+        if user_stat['total'] >= 3
+    ))
     
     try:
         await channel.send(embed=embed)
@@ -1247,20 +2059,21 @@ async def backup_command(interaction: discord.Interaction):
         return
     
     with db_connection() as conn:
-        cur = conn.cursor()
+        # Plain dict rows serialize directly, no per-row conversion
+        cur = conn.cursor(cursor_factory=RealDictCursor)
         cur.execute("SELECT user_id, username, points FROM users")
         users = cur.fetchall()
         cur.execute("SELECT user_id, match_id, prediction FROM predictions")
         predictions = cur.fetchall()
     
     backup_data = {
-        "users": [dict(u) for u in users],
-        "predictions": [dict(p) for p in predictions],
+        "users": users,
+        "predictions": predictions,
         "backup_time": datetime.now(timezone.utc).isoformat()
     }
     
-    file_content = json.dumps(backup_data, indent=2)
-    file = discord.File(StringIO(file_content), filename=f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    file_content = orjson.dumps(backup_data, option=orjson.OPT_INDENT_2)
+    file = discord.File(BytesIO(file_content), filename=f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
     
     await interaction.response.send_message("Database backup:", file=file, ephemeral=True)
 
@@ -1306,6 +2119,15 @@ async def fixdb_command(interaction: discord.Interaction):
             cur.execute("ALTER TABLE posted_matches ADD COLUMN IF NOT EXISTS away_score INTEGER")
             cur.execute("ALTER TABLE posted_matches ADD COLUMN IF NOT EXISTS status TEXT DEFAULT 'SCHEDULED'")
             cur.execute("ALTER TABLE posted_matches ADD COLUMN IF NOT EXISTS notification_sent BOOLEAN DEFAULT FALSE")
+            cur.execute("""
+                ALTER TABLE posted_matches ADD COLUMN IF NOT EXISTS actual_result TEXT GENERATED ALWAYS AS (
+                    CASE
+                        WHEN home_score > away_score THEN 'home'
+                        WHEN away_score > home_score THEN 'away'
+                        WHEN home_score IS NOT NULL THEN 'draw'
+                    END
+                ) STORED
+            """)
             cur.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS current_streak INTEGER DEFAULT 0")
             cur.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS best_streak INTEGER DEFAULT 0")
             cur.execute("""
@@ -1317,6 +2139,18 @@ async def fixdb_command(interaction: discord.Interaction):
                     PRIMARY KEY (user_id, week_start)
                 )
             """)
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_predictions_match_pred ON predictions(match_id, prediction)")
+            cur.execute("DROP INDEX IF EXISTS idx_predictions_match_id")
+            cur.execute("""
+                CREATE INDEX IF NOT EXISTS idx_posted_matches_notify ON posted_matches(match_time)
+                WHERE notification_sent = FALSE AND status = 'SCHEDULED'
+            """)
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_weekly_stats_week ON weekly_stats(week_start)")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_users_points ON users(points DESC, username ASC)")
+            cur.execute("""
+                CREATE INDEX IF NOT EXISTS idx_posted_matches_pending ON posted_matches(match_time)
+                WHERE status != 'FINISHED'
+            """)
             conn.commit()
         
         await interaction.followup.send("Database schema updated successfully!", ephemeral=True)
@@ -1337,13 +2171,14 @@ async def forcefetch_command(interaction: discord.Interaction):
         await interaction.followup.send(f"No matches found in next 48 hours.", ephemeral=True)
         return
     
+    new_matches = [m for m in upcoming if not is_match_posted(str(m["id"]))]
+    images = await prefetch_match_images(new_matches)
+    
     posted_count = 0
-    for match in upcoming:
-        match_id = str(match["id"])
-        if not is_match_posted(match_id):
-            await post_match(match)
-            posted_count += 1
-            await asyncio.sleep(1)
+    for match in new_matches:
+        await post_match(match, images.get(str(match["id"])))
+        posted_count += 1
+        await asyncio.sleep(1)
     
     await interaction.followup.send(f"Found {len(upcoming)} matches. Posted {posted_count} new matches.", ephemeral=True)
 
@@ -1376,21 +2211,17 @@ async def checkdb_command(interaction: discord.Interaction):
     with db_connection() as conn:
         cur = conn.cursor()
         
-        # Check finished matches
-        cur.execute("SELECT COUNT(*) as count FROM posted_matches WHERE home_score IS NOT NULL")
-        finished = cur.fetchone()['count']
-        
-        # Check total matches
-        cur.execute("SELECT COUNT(*) as count FROM posted_matches")
-        total = cur.fetchone()['count']
-        
-        # Check processed matches
-        cur.execute("SELECT COUNT(*) as count FROM processed_matches")
-        processed = cur.fetchone()['count']
-        
-        # Check total predictions
-        cur.execute("SELECT COUNT(*) as count FROM predictions")
-        total_preds = cur.fetchone()['count']
+        # Finished, total and processed matches plus total predictions in one round trip
+        cur.execute("""
+            SELECT COUNT(*) FILTER (WHERE home_score IS NOT NULL) as finished,
+                   COUNT(*) as total,
+                   (SELECT COUNT(*) FROM processed_matches) as processed,
+                   (SELECT COUNT(*) FROM predictions) as total_preds
+            FROM posted_matches
+        """)
+        counts = cur.fetchone()
+        finished, total = counts['finished'], counts['total']
+        processed, total_preds = counts['processed'], counts['total_preds']
         
         await interaction.response.send_message(
             f"**Database Status:**\n"
@@ -1415,7 +2246,7 @@ async def repostmatches_command(interaction: discord.Interaction):
     with db_connection() as conn:
         cur = conn.cursor()
         cur.execute("""
-            SELECT match_id, home_team, away_team, match_time, competition
+            SELECT match_id, home_team, away_team, match_time AT TIME ZONE 'UTC' AS match_time, competition
             FROM posted_matches
             WHERE match_time > %s AND status != 'FINISHED'
             ORDER BY match_time ASC
@@ -1429,19 +2260,20 @@ async def repostmatches_command(interaction: discord.Interaction):
     # Fetch fresh match data from API to get crests
     await interaction.followup.send("Fetching match details from API...", ephemeral=True)
     
+    # Only the window spanned by the stored matches; a day of slack absorbs timezone skew
+    date_from = now.date()
+    date_to = matches[-1]['match_time'].date() + timedelta(days=1)
+    session = get_http_session()
+    responses = await asyncio.gather(*(
+        fetch_football_data(session, f"{BASE_URL}{comp}/matches?dateFrom={date_from}&dateTo={date_to}")
+        for comp in COMPETITIONS
+    ))
+    
     api_matches = {}
-    async with aiohttp.ClientSession() as session:
-        for comp in COMPETITIONS:
-            url = f"{BASE_URL}{comp}/matches"
-            try:
-                async with session.get(url, headers=HEADERS, timeout=aiohttp.ClientTimeout(total=10)) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        for m in data.get("matches", []):
-                            api_matches[str(m["id"])] = m
-                    await asyncio.sleep(1)
-            except Exception as e:
-                print(f"Error fetching {comp}: {e}")
+    for data in responses:
+        if data:
+            for m in data.get("matches", []):
+                api_matches[str(m["id"])] = m
     
     channel = bot.get_channel(MATCH_CHANNEL_ID)
     if not channel:
@@ -1481,8 +2313,6 @@ async def repostmatches_command(interaction: discord.Interaction):
         for match in comp_matches:
             match_id = match['match_id']
             match_time = match['match_time']
-            if match_time.tzinfo is None:
-                match_time = match_time.replace(tzinfo=timezone.utc)
             
             kickoff_ts = int(match_time.timestamp())
             home_team = match['home_team']
@@ -1490,17 +2320,7 @@ async def repostmatches_command(interaction: discord.Interaction):
             competition = match['competition'] or 'Unknown'
             
             # Calculate countdown
-            time_until = match_time - now
-            days = time_until.days
-            hours = time_until.seconds // 3600
-            
-            if days > 0:
-                countdown = f"⏰ in {days} day{'s' if days != 1 else ''}"
-            elif hours > 0:
-                countdown = f"⏰ in ~{hours + (days * 24)} hours"
-            else:
-                mins = time_until.seconds // 60
-                countdown = f"⏰ in {mins} minutes"
+            countdown = format_countdown(match_time - now)
             
             # Determine competition info
             comp_info = {"flag": "🌍", "country": "International"}
@@ -1552,17 +2372,28 @@ async def repostmatches_command(interaction: discord.Interaction):
             view = PersistentVoteView(match_id)
             
             try:
+                old_vote_msg = await run_db(get_vote_message_id, match_id)
                 match_message = await channel.send(embed=embed, file=file, view=view)
-                save_vote_message(match_id, match_message.id)
-                
-                # Post live predictions embed
-                live_embed = create_live_predictions_embed(match_id, home_team, away_team)
-                live_message = await channel.send(embed=live_embed)
-                save_live_predictions_message(match_id, live_message.id)
+                # Grey out the previous post's buttons; the kickoff job only knows about the new message
+                if old_vote_msg and old_vote_msg['votes_msg_id']:
+                    try:
+                        await channel.get_partial_message(old_vote_msg['votes_msg_id']).edit(view=get_disabled_vote_view())
+                    except discord.errors.NotFound:
+                        pass
+                    except Exception as e:
+                        print(f"Failed to disable old vote buttons for {match_id}: {e}")
+                # Stop the previous post's view, or it stays in discord.py's view store for good
+                old_view = active_vote_views.pop(match_id, None)
+                if old_view:
+                    old_view.stop()
+                active_vote_views[match_id] = view
                 
-                # Add thin separator between matches
-                separator_line = discord.Embed(description="───────────────────────────────", color=discord.Color.dark_gray())
-                await channel.send(embed=separator_line)
+                # Post live predictions embed with the separator in the same message
+                votes = await run_db(get_predictions_for_match, match_id)
+                live_embed = create_live_predictions_embed(match_id, home_team, away_team, votes)
+                live_message = await channel.send(embeds=[live_embed, MATCH_SEPARATOR_EMBED])
+                await run_db(save_match_messages, match_id, match_message.id, live_message.id)
+                schedule_kickoff_disable(match_id, match_time)
                 
                 reposted += 1
                 await asyncio.sleep(1)
@@ -1603,29 +2434,23 @@ async def matches_command(interaction: discord.Interaction):
         await asyncio.sleep(0.5)
         
         # Post matches
+        images = await prefetch_match_images([m for m in league_matches if not is_match_posted(str(m["id"]))])
         for m in league_matches:
-            await post_match(m)
+            await post_match(m, images.get(str(m["id"])))
             await asyncio.sleep(0.5)
     
     await interaction.followup.send("Posted upcoming matches!", ephemeral=True)
 
 @bot.tree.command(name="leaderboard", description="Show the leaderboard")
 async def leaderboard_command(interaction: discord.Interaction):
-    leaderboard = get_leaderboard()
+    leaderboard = await run_db(get_top_leaderboard, 10)
     if not leaderboard:
         await interaction.response.send_message("Leaderboard is empty.", ephemeral=True)
         return
     
-    # Get prediction counts for each user
-    prediction_counts = {}
-    with db_connection() as conn:
-        cur = conn.cursor()
-        for entry in leaderboard:
-            cur.execute("SELECT COUNT(*) as count FROM predictions WHERE user_id = %s", (entry['user_id'],))
-            prediction_counts[entry['user_id']] = cur.fetchone()['count']
-    
-    # Medal emojis
-    medals = ["🥇", "🥈", "🥉"]
+    # Prediction counts for the displayed users and the footer totals in one query
+    stats = await run_db(get_leaderboard_stats, [entry['user_id'] for entry in leaderboard[:3]])
+    prediction_counts = stats['prediction_counts']
     
     embed = discord.Embed(
         title="🏆 Prediction Leaderboard",
@@ -1638,9 +2463,8 @@ async def leaderboard_command(interaction: discord.Interaction):
     for i, entry in enumerate(leaderboard[:3]):
         pred_count = prediction_counts.get(entry['user_id'], 0)
         accuracy = (entry['points'] / pred_count * 100) if pred_count > 0 else 0
-        streaks = get_user_streaks(entry['user_id'])
-        streak_text = f" 🔥{streaks['current_streak']}" if streaks['current_streak'] >= 3 else ""
-        top_3.append(f"{medals[i]} **{entry['username']}**{streak_text}\n**{entry['points']} pts** • {accuracy:.0f}% accuracy • {pred_count} predictions")
+        streak_text = f" 🔥{entry['current_streak']}" if entry['current_streak'] >= 3 else ""
+        top_3.append(f"{MEDALS[i]} **{entry['username']}**{streak_text}\n**{entry['points']} pts** • {accuracy:.0f}% accuracy • {pred_count} predictions")
     
     embed.add_field(name="👑 Top 3", value="\n\n".join(top_3), inline=False)
     
@@ -1648,122 +2472,108 @@ async def leaderboard_command(interaction: discord.Interaction):
     if len(leaderboard) > 3:
         rest = []
         for i, entry in enumerate(leaderboard[3:10], start=4):
-            pred_count = prediction_counts.get(entry['user_id'], 0)
             rest.append(f"`{i}.` **{entry['username']}** • {entry['points']} pts")
         
         if rest:
             embed.add_field(name="📊 Rankings", value="\n".join(rest), inline=False)
     
     # Footer
-    total_players = len(leaderboard)
-    total_predictions = sum(prediction_counts.values())
+    total_players = stats['players']
+    total_predictions = stats['predictions']
     embed.set_footer(text=f"{total_players} active players • {total_predictions} total predictions made")
     
     await interaction.response.send_message(embed=embed)
 
+# Static pointer field shared by every /ticket embed
+TICKET_DETAILS_FIELD = {
+    "name": "📋 View Details",
+    "value": "Use `/upcoming` to see future matches\nUse `/history` to see past results",
+    "inline": False
+}
+TICKET_COLOR = discord.Color.blue().value
+
 @bot.tree.command(name="ticket", description="Show your recent predictions summary")
 async def ticket_command(interaction: discord.Interaction, user: discord.Member = None):
-    await interaction.response.defer(ephemeral=True)
-    
     target_user = user or interaction.user
     user_id = str(target_user.id)
     
-    user_data = get_user(user_id)
-    if not user_data:
-        await interaction.followup.send(f"{target_user.name} has no predictions yet.", ephemeral=True)
+    # Answer in one response when the summary is cached; otherwise defer, as the read can queue behind other DB work
+    summary = peek_user_summary(user_id)
+    send = interaction.response.send_message
+    if summary is None:
+        await interaction.response.defer(ephemeral=True)
+        send = interaction.followup.send
+        summary = await run_db(get_user_summary, user_id)
+    if not summary:
+        await send(f"{target_user.name} has no predictions yet.", ephemeral=True)
         return
     
-    stats = get_user_stats(user_id)
-    streaks = get_user_streaks(user_id)
-    
     # Header embed with stats only
-    header_embed = discord.Embed(
-        title=f"🎫 {target_user.name}'s Prediction Ticket",
-        description="Quick summary of your predictions",
-        color=discord.Color.blue()
-    )
-    header_embed.set_thumbnail(url=target_user.display_avatar.url)
-    
-    # Stats summary
-    accuracy_bar = "█" * int(stats['accuracy'] / 5) if stats['accuracy'] > 0 else "░"
-    streak_emoji = "🔥" if streaks['current_streak'] >= 3 else "📈"
-    header_embed.add_field(
-        name="📊 Performance",
-        value=f"**Points:** {user_data['points']}\n"
-              f"**Accuracy:** `{accuracy_bar}` {stats['accuracy']:.1f}%\n"
-              f"{streak_emoji} **Streak:** {streaks['current_streak']}",
-        inline=True
-    )
-    header_embed.add_field(
-        name="🎯 Record",
-        value=f"**Correct:** {stats['correct']}\n"
-              f"**Total:** {stats['total']}\n"
-              f"**Best Streak:** {streaks['best_streak']}",
-        inline=True
-    )
-    
-    header_embed.add_field(
-        name="📋 View Details",
-        value="Use `/upcoming` to see future matches\nUse `/history` to see past results",
-        inline=False
-    )
-    
-    await interaction.followup.send(embed=header_embed, ephemeral=True)
+    accuracy_bar = percent_bar(summary['accuracy'])
+    streak_emoji = "🔥" if summary['current_streak'] >= 3 else "📈"
+    header_embed = discord.Embed.from_dict({
+        "title": f"🎫 {target_user.name}'s Prediction Ticket",
+        "description": "Quick summary of your predictions",
+        "color": TICKET_COLOR,
+        "thumbnail": {"url": target_user.display_avatar.url},
+        "fields": [
+            {
+                "name": "📊 Performance",
+                "value": f"**Points:** {summary['points']}\n"
+                         f"**Accuracy:** `{accuracy_bar}` {summary['accuracy']:.1f}%\n"
+                         f"{streak_emoji} **Streak:** {summary['current_streak']}",
+                "inline": True
+            },
+            {
+                "name": "🎯 Record",
+                "value": f"**Correct:** {summary['correct']}\n"
+                         f"**Total:** {summary['total']}\n"
+                         f"**Best Streak:** {summary['best_streak']}",
+                "inline": True
+            },
+            TICKET_DETAILS_FIELD
+        ]
+    })
+    
+    await send(embed=header_embed, ephemeral=True)
 
 @bot.tree.command(name="upcoming", description="Show all your upcoming predictions")
-async def upcoming_command(interaction: discord.Interaction, user: discord.Member = None):
+async def upcoming_command(interaction: discord.Interaction, user: discord.Member = None, page: int = 1):
     await interaction.response.defer(ephemeral=True)
     
     target_user = user or interaction.user
     user_id = str(target_user.id)
-    
-    with db_connection() as conn:
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT p.match_id, p.prediction, pm.home_team, pm.away_team, pm.match_time,
-                   pm.competition, pm.status, pm.home_score, pm.away_score
-            FROM predictions p
-            LEFT JOIN posted_matches pm ON p.match_id = pm.match_id
-            WHERE p.user_id = %s
-            AND pm.status != 'FINISHED'
-            ORDER BY pm.match_time ASC
-        """, (user_id,))
-        predictions = cur.fetchall()
-    
-    if not predictions:
-        await interaction.followup.send("No upcoming or ongoing predictions.", ephemeral=True)
-        return
+    page = max(1, page)
+    offset = (page - 1) * PREDICTIONS_PAGE_SIZE
     
     now = datetime.now(timezone.utc)
     
-    # Separate into ongoing and upcoming
-    ongoing = []
-    upcoming = []
+    # Live matches head the first page only; upcoming ones are paged in SQL
+    if page == 1:
+        ongoing, upcoming = await asyncio.gather(
+            run_db(get_ongoing_predictions, user_id, now),
+            run_db(get_upcoming_predictions, user_id, now, PREDICTIONS_PAGE_SIZE, offset)
+        )
+    else:
+        ongoing = []
+        upcoming = await run_db(get_upcoming_predictions, user_id, now, PREDICTIONS_PAGE_SIZE, offset)
     
-    for pred in predictions:
-        if pred['match_time']:
-            match_time = pred['match_time']
-            if match_time.tzinfo is None:
-                match_time = match_time.replace(tzinfo=timezone.utc)
-            
-            if match_time <= now:
-                ongoing.append(pred)
-            else:
-                upcoming.append(pred)
+    if not ongoing and not upcoming:
+        if page == 1:
+            await interaction.followup.send("No upcoming or ongoing predictions.", ephemeral=True)
+        else:
+            await interaction.followup.send(f"No upcoming predictions on page {page}.", ephemeral=True)
+        return
     
     # Create embeds
     embeds_to_send = []
     
     # Ongoing matches embed
     if ongoing:
-        ongoing_embed = discord.Embed(
-            title="⚽ Live Matches",
-            description=f"{len(ongoing)} match{'es' if len(ongoing) != 1 else ''} in progress",
-            color=discord.Color.red()
-        )
-        
-        for pred in ongoing[:15]:  # Limit to 15
-            pred_emoji = {"home": "🏠", "draw": "🤝", "away": "✈️"}.get(pred['prediction'], "🔮")
+        total_ongoing = ongoing[0]['total_count']
+        fields = []
+        for pred in ongoing:
+            pred_emoji = PRED_EMOJI.get(pred['prediction'], "🔮")
             comp_short = pred['competition'][:20] if pred['competition'] else "Unknown"
             
             # Show live score if available
@@ -1772,151 +2582,121 @@ async def upcoming_command(interaction: discord.Interaction, user: discord.Membe
             else:
                 score_text = "In Progress"
             
-            ongoing_embed.add_field(
-                name=f"🔴 {pred['home_team']} vs {pred['away_team']}",
-                value=f"{pred_emoji} Predicted: **{pred['prediction'].capitalize()}** • {comp_short}\n{score_text}",
-                inline=False
-            )
-        
-        embeds_to_send.append(ongoing_embed)
+            fields.append({
+                "name": f"🔴 {pred['home_team']} vs {pred['away_team']}",
+                "value": f"{pred_emoji} Predicted: **{PRED_LABEL[pred['prediction']]}** • {comp_short}\n{score_text}",
+                "inline": False
+            })
+        
+        # Both queries stay under Discord's 25-field cap, so the fields go in as one list
+        embeds_to_send.append(discord.Embed.from_dict({
+            "title": "⚽ Live Matches",
+            "description": f"{total_ongoing} match{'es' if total_ongoing != 1 else ''} in progress",
+            "color": discord.Color.red().value,
+            "fields": fields
+        }))
     
     # Upcoming matches embed
     if upcoming:
-        for i in range(0, len(upcoming), 20):
-            chunk = upcoming[i:i+20]
-            upcoming_embed = discord.Embed(
-                title=f"🔮 Upcoming Predictions ({i+1}-{min(i+20, len(upcoming))} of {len(upcoming)})",
-                color=discord.Color.blue()
-            )
-            
-            for pred in chunk:
-                match_time = pred['match_time']
-                if match_time.tzinfo is None:
-                    match_time = match_time.replace(tzinfo=timezone.utc)
-                
-                time_until = match_time - now
-                if time_until.total_seconds() > 0:
-                    status = f"⏰ <t:{int(match_time.timestamp())}:R>"
-                else:
-                    status = "Starting soon"
-                
-                pred_emoji = {"home": "🏠", "draw": "🤝", "away": "✈️"}.get(pred['prediction'], "🔮")
-                comp_short = pred['competition'][:20] if pred['competition'] else "Unknown"
-                
-                upcoming_embed.add_field(
-                    name=f"{pred['home_team']} vs {pred['away_team']}",
-                    value=f"{pred_emoji} **{pred['prediction'].capitalize()}** • {comp_short}\n{status}",
-                    inline=False
-                )
+        total_upcoming = upcoming[0]['total_count']
+        fields = []
+        for pred in upcoming:
+            # The query only returns matches after `now`, so every row gets a countdown
+            status = f"⏰ <t:{pred['kickoff_ts']}:R>"
+            pred_emoji = PRED_EMOJI.get(pred['prediction'], "🔮")
+            comp_short = pred['competition'][:20] if pred['competition'] else "Unknown"
             
-            embeds_to_send.append(upcoming_embed)
+            fields.append({
+                "name": f"{pred['home_team']} vs {pred['away_team']}",
+                "value": f"{pred_emoji} **{PRED_LABEL[pred['prediction']]}** • {comp_short}\n{status}",
+                "inline": False
+            })
+        
+        upcoming_embed = discord.Embed.from_dict({
+            "title": f"🔮 Upcoming Predictions ({offset+1}-{offset+len(upcoming)} of {total_upcoming})",
+            "color": discord.Color.blue().value,
+            "fields": fields
+        })
+        if offset + len(upcoming) < total_upcoming:
+            upcoming_embed.set_footer(text=f"Use page:{page + 1} to see more")
+        
+        embeds_to_send.append(upcoming_embed)
     
-    # Send all embeds
-    for embed in embeds_to_send:
-        await interaction.followup.send(embed=embed, ephemeral=True)
+    # Both embeds go out in one message
+    await interaction.followup.send(embeds=embeds_to_send, ephemeral=True)
 
 @bot.tree.command(name="history", description="Show your recent match results")
-async def history_command(interaction: discord.Interaction, user: discord.Member = None, days: int = 7):
+async def history_command(interaction: discord.Interaction, user: discord.Member = None, days: int = 7, page: int = 1):
     await interaction.response.defer(ephemeral=True)
     
     target_user = user or interaction.user
     user_id = str(target_user.id)
+    page = max(1, page)
+    offset = (page - 1) * PREDICTIONS_PAGE_SIZE
     
     lookback = datetime.now(timezone.utc) - timedelta(days=days)
     
-    with db_connection() as conn:
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT p.match_id, p.prediction, pm.home_team, pm.away_team, pm.match_time,
-                   pm.home_score, pm.away_score, pm.status, pm.competition
-            FROM predictions p
-            LEFT JOIN posted_matches pm ON p.match_id = pm.match_id
-            WHERE p.user_id = %s
-            AND pm.home_score IS NOT NULL
-            AND pm.match_time >= %s
-            ORDER BY pm.match_time DESC
-        """, (user_id, lookback))
-        predictions = cur.fetchall()
+    predictions = await run_db(get_finished_predictions, user_id, lookback, PREDICTIONS_PAGE_SIZE, offset)
     
     if not predictions:
-        await interaction.followup.send(f"No finished matches in the last {days} days.", ephemeral=True)
+        if page == 1:
+            await interaction.followup.send(f"No finished matches in the last {days} days.", ephemeral=True)
+        else:
+            await interaction.followup.send(f"No finished matches on page {page}.", ephemeral=True)
         return
     
-    # Split into multiple embeds (20 per embed)
-    total_correct = 0
-    for i in range(0, len(predictions), 20):
-        chunk = predictions[i:i+20]
-        embed = discord.Embed(
-            title=f"🏆 Match History ({i+1}-{min(i+20, len(predictions))} of {len(predictions)})",
-            description=f"Results from last {days} days",
-            color=discord.Color.gold()
+    total = predictions[0]['total_count']
+    total_correct = predictions[0]['total_correct']
+    
+    # One description block instead of a field per match keeps the payload small
+    rows = [f"Results from last {days} days"]
+    page_correct = 0
+    for pred in predictions:
+        if pred['is_correct']:
+            page_correct += 1
+        
+        result_emoji = "✅" if pred['is_correct'] else "❌"
+        pred_emoji = PRED_EMOJI.get(pred['prediction'], "🔮")
+        rows.append(
+            f"\n{result_emoji} **{pred['home_team']} {pred['home_score']}-{pred['away_score']} {pred['away_team']}**\n"
+            f"{pred_emoji} Predicted: **{PRED_LABEL[pred['prediction']]}**"
         )
-        
-        chunk_correct = 0
-        for pred in chunk:
-            # Determine actual result
-            if pred['home_score'] > pred['away_score']:
-                actual_result = 'home'
-            elif pred['away_score'] > pred['home_score']:
-                actual_result = 'away'
-            else:
-                actual_result = 'draw'
-            
-            is_correct = actual_result == pred['prediction']
-            if is_correct:
-                chunk_correct += 1
-                total_correct += 1
-            
-            result_emoji = "✅" if is_correct else "❌"
-            pred_emoji = {"home": "🏠", "draw": "🤝", "away": "✈️"}.get(pred['prediction'], "🔮")
-            
-            embed.add_field(
-                name=f"{result_emoji} {pred['home_team']} {pred['home_score']}-{pred['away_score']} {pred['away_team']}",
-                value=f"{pred_emoji} Predicted: **{pred['prediction'].capitalize()}**",
-                inline=False
-            )
-        
-        chunk_accuracy = (chunk_correct / len(chunk) * 100) if chunk else 0
-        embed.set_footer(text=f"This page: {chunk_correct}/{len(chunk)} ({chunk_accuracy:.0f}%)")
-        
-        await interaction.followup.send(embed=embed, ephemeral=True)
     
-    # Send summary at the end
-    total_accuracy = (total_correct / len(predictions) * 100)
+    embed = discord.Embed(
+        title=f"🏆 Match History ({offset+1}-{offset+len(predictions)} of {total})",
+        description="\n".join(rows),
+        color=discord.Color.gold()
+    )
+    
+    page_accuracy = (page_correct / len(predictions) * 100)
+    footer = f"This page: {page_correct}/{len(predictions)} ({page_accuracy:.0f}%)"
+    if offset + len(predictions) < total:
+        footer += f" • Use page:{page + 1} to see more"
+    embed.set_footer(text=footer)
+    
+    # Summary goes below the page in the same message
+    total_accuracy = (total_correct / total * 100)
     summary = discord.Embed(
         title="📊 Summary",
-        description=f"**Overall:** {total_correct}/{len(predictions)} correct ({total_accuracy:.0f}%)",
+        description=f"**Overall:** {total_correct}/{total} correct ({total_accuracy:.0f}%)",
         color=discord.Color.green()
     )
-    await interaction.followup.send(embed=summary, ephemeral=True)
+    await interaction.followup.send(embeds=[embed, summary], ephemeral=True)
 
 @bot.tree.command(name="mystats", description="Show your detailed statistics")
 async def mystats_command(interaction: discord.Interaction):
     user_id = str(interaction.user.id)
-    user_data = get_user(user_id)
+    # Summary, competition breakdown and rank load together instead of one after another
+    summary, comp_breakdown, rank = await asyncio.gather(
+        run_db(get_user_summary, user_id),
+        run_db(get_competition_breakdown, user_id),
+        run_db(get_cached_rank, user_id)
+    )
     
-    if not user_data:
+    if not summary:
         await interaction.response.send_message("You haven't made any predictions yet!", ephemeral=True)
         return
     
-    stats = get_user_stats(user_id)
-    streaks = get_user_streaks(user_id)
-    
-    # Get breakdown by competition
-    with db_connection() as conn:
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT pm.competition, COUNT(*) as total,
-                   SUM(CASE WHEN proc.match_id IS NOT NULL THEN 1 ELSE 0 END) as finished
-            FROM predictions p
-            LEFT JOIN posted_matches pm ON p.match_id = pm.match_id
-            LEFT JOIN processed_matches proc ON p.match_id = proc.match_id
-            WHERE p.user_id = %s AND pm.competition IS NOT NULL
-            GROUP BY pm.competition
-            ORDER BY total DESC
-        """, (user_id,))
-        comp_breakdown = cur.fetchall()
-    
     embed = discord.Embed(
         title=f"📊 {interaction.user.name}'s Statistics",
         description="Your prediction performance summary",
@@ -1927,42 +2707,40 @@ async def mystats_command(interaction: discord.Interaction):
     embed.set_thumbnail(url=interaction.user.display_avatar.url)
     
     # Overall stats with visual bars
-    accuracy_bar = "█" * int(stats['accuracy'] / 5) if stats['accuracy'] > 0 else "░"
+    accuracy_bar = percent_bar(summary['accuracy'])
     embed.add_field(
         name="🎯 Overall Performance",
-        value=f"**Points:** {user_data['points']}\n"
-              f"**Predictions:** {stats['total']}\n"
-              f"**Correct:** {stats['correct']}\n"
-              f"**Accuracy:** `{accuracy_bar}` {stats['accuracy']:.1f}%",
+        value=f"**Points:** {summary['points']}\n"
+              f"**Predictions:** {summary['total']}\n"
+              f"**Correct:** {summary['correct']}\n"
+              f"**Accuracy:** `{accuracy_bar}` {summary['accuracy']:.1f}%",
         inline=False
     )
     
     # Streaks with fire emoji
-    streak_emoji = "🔥" if streaks['current_streak'] >= 3 else "📈"
-    streak_display = f"**{streaks['current_streak']}**" if streaks['current_streak'] >= 3 else streaks['current_streak']
+    streak_emoji = "🔥" if summary['current_streak'] >= 3 else "📈"
+    streak_display = f"**{summary['current_streak']}**" if summary['current_streak'] >= 3 else summary['current_streak']
     embed.add_field(
         name=f"{streak_emoji} Streaks",
         value=f"**Current:** {streak_display}\n"
-              f"**Best:** {streaks['best_streak']}",
+              f"**Best:** {summary['best_streak']}",
         inline=True
     )
     
     # Leaderboard position
-    leaderboard = get_leaderboard()
-    position = next((i+1 for i, entry in enumerate(leaderboard) if entry['user_id'] == user_id), None)
-    
-    if position:
+    if rank:
+        position = rank['position']
         rank_emoji = "👑" if position == 1 else "🏅" if position <= 3 else "📊"
         embed.add_field(
             name=f"{rank_emoji} Rank",
-            value=f"**#{position}** of {len(leaderboard)}",
+            value=f"**#{position}** of {rank['total']}",
             inline=True
         )
     
     # Competition breakdown
     if comp_breakdown:
         comp_text = []
-        for comp in comp_breakdown[:5]:
+        for comp in comp_breakdown:
             comp_text.append(f"**{comp['competition']}:** {comp['total']} predictions")
         
         embed.add_field(
@@ -1979,54 +2757,42 @@ async def mystats_command(interaction: discord.Interaction):
 async def unpick_command(interaction: discord.Interaction, match_id: str):
     user_id = str(interaction.user.id)
     
-    # Check if match exists and hasn't started
-    match_info = get_match_info(match_id)
-    if not match_info:
+    result = await run_db(unpick_prediction, user_id, match_id, datetime.now(timezone.utc))
+    if not result:
         await interaction.response.send_message("Match not found!", ephemeral=True)
         return
     
-    # Check if match has started
-    match_time = match_info['match_time']
-    if match_time.tzinfo is None:
-        match_time = match_time.replace(tzinfo=timezone.utc)
-    
-    if datetime.now(timezone.utc) >= match_time:
+    if result['started']:
         await interaction.response.send_message("Can't delete prediction - match has already started!", ephemeral=True)
         return
     
-    # Check if user has prediction
-    prediction = get_user_prediction(user_id, match_id)
-    if not prediction:
+    if not result['prediction']:
         await interaction.response.send_message("You haven't made a prediction for this match!", ephemeral=True)
         return
     
-    # Delete prediction
-    if delete_prediction(user_id, match_id):
-        # Update live predictions embed
-        live_msg_id = get_live_predictions_message_id(match_id)
-        if live_msg_id:
-            try:
-                channel = bot.get_channel(MATCH_CHANNEL_ID)
-                live_message = await channel.fetch_message(live_msg_id)
-                embed = create_live_predictions_embed(match_id, match_info['home_team'], match_info['away_team'])
-                await live_message.edit(embed=embed)
-            except Exception as e:
-                print(f"Failed to update live predictions: {e}")
-        
-        await interaction.response.send_message(
-            f"Deleted your **{prediction.capitalize()}** prediction for {match_info['home_team']} vs {match_info['away_team']}",
-            ephemeral=True
-        )
-    else:
-        await interaction.response.send_message("Failed to delete prediction. Try again!", ephemeral=True)
+    forget_vote(user_id, match_id)
+    # Update live predictions embed
+    if result['live_predictions_msg_id']:
+        schedule_live_predictions_refresh(bot.get_channel(MATCH_CHANNEL_ID), result['live_predictions_msg_id'], match_id,
+                                          result['home_team'], result['away_team'])
+    
+    await interaction.response.send_message(
+        f"Deleted your **{PRED_LABEL[result['prediction']]}** prediction for {result['home_team']} vs {result['away_team']}",
+        ephemeral=True
+    )
 
 @bot.tree.command(name="compare", description="Compare stats with another user")
 async def compare_command(interaction: discord.Interaction, user: discord.Member):
     user1_id = str(interaction.user.id)
     user2_id = str(user.id)
     
-    user1_data = get_user(user1_id)
-    user2_data = get_user(user2_id)
+    # Both users' points and stats in one query, alongside their shared matches
+    summaries, head_to_head = await asyncio.gather(
+        run_db(get_user_summaries, [user1_id, user2_id]),
+        run_db(get_head_to_head, user1_id, user2_id)
+    )
+    user1_data = summaries.get(user1_id)
+    user2_data = summaries.get(user2_id)
     
     if not user1_data:
         await interaction.response.send_message("You haven't made any predictions yet!", ephemeral=True)
@@ -2036,9 +2802,6 @@ async def compare_command(interaction: discord.Interaction, user: discord.Member
         await interaction.response.send_message(f"{user.name} hasn't made any predictions yet!", ephemeral=True)
         return
     
-    stats1 = get_user_stats(user1_id)
-    stats2 = get_user_stats(user2_id)
-    
     embed = discord.Embed(
         title=f"⚔️ {interaction.user.name} vs {user.name}",
         color=discord.Color.purple()
@@ -2064,58 +2827,23 @@ async def compare_command(interaction: discord.Interaction, user: discord.Member
     # Accuracy comparison
     embed.add_field(
         name="🎯 Accuracy",
-        value=f"{interaction.user.name}: {stats1['accuracy']:.1f}% ({stats1['correct']}/{stats1['total']})\n"
-              f"{user.name}: {stats2['accuracy']:.1f}% ({stats2['correct']}/{stats2['total']})",
+        value=f"{interaction.user.name}: {user1_data['accuracy']:.1f}% ({user1_data['correct']}/{user1_data['total']})\n"
+              f"{user.name}: {user2_data['accuracy']:.1f}% ({user2_data['correct']}/{user2_data['total']})",
         inline=False
     )
     
     # Head to head on same matches
-    with db_connection() as conn:
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT 
-                p1.match_id,
-                p1.prediction as user1_pred,
-                p2.prediction as user2_pred,
-                pm.home_team,
-                pm.away_team,
-                pm.home_score,
-                pm.away_score,
-                pm.status
-            FROM predictions p1
-            INNER JOIN predictions p2 ON p1.match_id = p2.match_id
-            LEFT JOIN posted_matches pm ON p1.match_id = pm.match_id
-            WHERE p1.user_id = %s AND p2.user_id = %s
-            AND pm.status = 'FINISHED' AND pm.home_score IS NOT NULL
-            ORDER BY pm.match_time DESC
-            LIMIT 5
-        """, (user1_id, user2_id))
-        head_to_head = cur.fetchall()
-    
     if head_to_head:
         h2h_text = []
-        user1_wins = 0
-        user2_wins = 0
+        user1_wins = head_to_head[0]['user1_wins']
+        user2_wins = head_to_head[0]['user2_wins']
         
         for match in head_to_head:
-            # Determine actual result
-            if match['home_score'] > match['away_score']:
-                actual = 'home'
-            elif match['away_score'] > match['home_score']:
-                actual = 'away'
-            else:
-                actual = 'draw'
-            
-            user1_correct = match['user1_pred'] == actual
-            user2_correct = match['user2_pred'] == actual
-            
-            if user1_correct and not user2_correct:
-                user1_wins += 1
+            if match['user1_correct'] and not match['user2_correct']:
                 result = f"✅ {interaction.user.name}"
-            elif user2_correct and not user1_correct:
-                user2_wins += 1
+            elif match['user2_correct'] and not match['user1_correct']:
                 result = f"✅ {user.name}"
-            elif user1_correct and user2_correct:
+            elif match['user1_correct'] and match['user2_correct']:
                 result = "🤝 Both"
             else:
                 result = "❌ Neither"
@@ -2126,35 +2854,94 @@ async def compare_command(interaction: discord.Interaction, user: discord.Member
             name=f"🥊 Head-to-Head (Last 5 Shared Matches)",
             value=f"**{interaction.user.name} wins:** {user1_wins}\n"
                   f"**{user.name} wins:** {user2_wins}\n\n"
-                  + "\n".join(h2h_text[:3]),
+                  + "\n".join(h2h_text),
             inline=False
         )
     
     await interaction.response.send_message(embed=embed)
 
 # ==== STARTUP ====
+COMMAND_TREE_HASH_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "command_tree.sha256")
+
+def command_tree_hash():
+    """Hash of the registered slash command payloads, to tell whether Discord needs a sync"""
+    payload = orjson.dumps([command.to_dict(bot.tree) for command in bot.tree.get_commands()],
+                           option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(payload).hexdigest()
+
+async def sync_command_tree():
+    """Sync slash commands with Discord, skipping the call when they haven't changed since the last sync"""
+    tree_hash = command_tree_hash()
+    try:
+        with open(COMMAND_TREE_HASH_PATH) as f:
+            if f.read().strip() == tree_hash:
+                return
+    except OSError:
+        pass
+    
+    await bot.tree.sync()
+    try:
+        os.makedirs(os.path.dirname(COMMAND_TREE_HASH_PATH), exist_ok=True)
+        with open(COMMAND_TREE_HASH_PATH, "w") as f:
+            f.write(tree_hash)
+    except OSError as e:
+        print(f"Failed to save command tree hash: {e}")
+
 @bot.event
 async def on_ready():
     init_db()
+    get_db_read_pool()  # before any worker thread can race to create it
+    load_known_match_ids()
     
     bot.add_view(PersistentVoteView())
     
-    await bot.tree.sync()
+    await sync_command_tree()
     
     update_match_results.start()
     send_match_notifications.start()
     weekly_recap.start()
     disable_buttons_at_kickoff.start()  # ADD THIS LINE
+    schedule_upcoming_kickoffs()
     scheduler.start()
     print(f"Logged in as {bot.user}")
 
+discord_close = bot.close
+bot_closing = False
+
+async def close_bot():
+    """Stop scheduled work and close the Discord client, then release the HTTP session and database pools"""
+    global bot_closing
+    # discord.py may call close() again from run()'s cleanup
+    if bot_closing:
+        return
+    bot_closing = True
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
+    for loop in (update_match_results, send_match_notifications, weekly_recap, disable_buttons_at_kickoff):
+        loop.stop()
+    await discord_close()
+    # Let in-flight run_db threads finish before their connections are closed under them
+    try:
+        await asyncio.wait_for(drain_db_threads(), timeout=10)
+    except asyncio.TimeoutError:
+        print("Timed out waiting for database work to finish before shutdown")
+    await close_http_session()
+    if db_pool is not None:
+        db_pool.closeall()
+    if db_read_pool is not None:
+        db_read_pool.closeall()
+
+bot.close = close_bot
+
 # ==== SCHEDULER ====
 scheduler = AsyncIOScheduler()
 
 async def daily_fetch_matches():
     matches = await fetch_matches()
-    for m in matches:
-        await post_match(m)
+    new_matches = [m for m in matches if not is_match_posted(str(m["id"]))]
+    images = await prefetch_match_images(new_matches)
+    for m in new_matches:
+        await post_match(m, images.get(str(m["id"])))
         await asyncio.sleep(1)
 
 scheduler.add_job(lambda: bot.loop.create_task(daily_fetch_matches()), "cron", hour=6, minute=0)